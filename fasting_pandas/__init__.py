@@ -1,9 +1,61 @@
-from .datasets import generate_testscore_df, generate_teamresult_df
-from .datasets import set_dtypes_for_teamresult_df
-from .utils import calculate_percentage_difference, calculate_memory_usage, timeit
-from .core import TimedPandas, TimedContext
-
-__all__ = ['generate_testscore_df', 'generate_teamresult_df',
-           'set_dtypes_for_teamresult_df',
-           'TimedPandas', 'TimedContext',
-           'calculate_percentage_difference', 'calculate_memory_usage', 'timeit']
\ No newline at end of file
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .datasets import generate_testscore_df, generate_teamresult_df
+    from .datasets import generate_testscore_chunk, generate_teamresult_chunk
+    from .datasets import iter_testscore_df, iter_teamresult_df, write_chunks
+    from .datasets import set_dtypes_for_teamresult_df, generate_wide_df
+    from .dtypes import optimize_dtypes, categorize, labels_to_bool, parse_dates_cached
+    from .fileio import infer_read_schema, read_csv_optimized, convert_csv_to_parquet
+    from .fileio import read_files, read_tables_async
+    from .rules import RuleSet, select_rules
+    from .parallel import parallel_apply
+    from .utils import calculate_percentage_difference, calculate_memory_usage, timeit
+    from .utils import summarize_timings, evict_from_page_cache
+    from .formats import (FileFormat, FORMATS, register_format, get_format, read_arrow_ipc_memory_mapped,
+                          write_arrow_ipc_single_batch)
+    from .core import TimedPandas, TimedContext, TimedResult, ResultStore
+    from .runs import start_run, list_runs, compare
+    from .profiling import CallProfile
+    from .cache import DatasetCache
+
+# Submodules are only imported when one of their names is first used, so importing the package
+# (e.g. in a short-lived benchmark worker) does not pay for pandas, sqlite3 or pyarrow up front.
+_SUBMODULE_ATTRIBUTES = {
+    'datasets': ['generate_testscore_df', 'generate_teamresult_df',
+                 'generate_testscore_chunk', 'generate_teamresult_chunk',
+                 'iter_testscore_df', 'iter_teamresult_df', 'write_chunks',
+                 'set_dtypes_for_teamresult_df', 'generate_wide_df'],
+    'dtypes': ['optimize_dtypes', 'categorize', 'labels_to_bool', 'parse_dates_cached'],
+    'fileio': ['infer_read_schema', 'read_csv_optimized', 'convert_csv_to_parquet',
+               'read_files', 'read_tables_async'],
+    'rules': ['RuleSet', 'select_rules'],
+    'parallel': ['parallel_apply'],
+    'core': ['TimedPandas', 'TimedContext', 'TimedResult', 'ResultStore'],
+    'runs': ['start_run', 'list_runs', 'compare'],
+    'profiling': ['CallProfile'],
+    'cache': ['DatasetCache'],
+    'formats': ['FileFormat', 'FORMATS', 'register_format', 'get_format', 'read_arrow_ipc_memory_mapped',
+                'write_arrow_ipc_single_batch'],
+    'utils': ['calculate_percentage_difference', 'calculate_memory_usage', 'timeit',
+              'summarize_timings', 'evict_from_page_cache'],
+}
+_ATTRIBUTE_SUBMODULES = {name: module for module, names in _SUBMODULE_ATTRIBUTES.items() for name in names}
+
+__all__ = [name for names in _SUBMODULE_ATTRIBUTES.values() for name in names]
+
+
+def __getattr__(name: str):
+    if name in _SUBMODULE_ATTRIBUTES:
+        return importlib.import_module(f'.{name}', __name__)
+    if name not in _ATTRIBUTE_SUBMODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_ATTRIBUTE_SUBMODULES[name]}', __name__), name)
+    # Cache it, so __getattr__ is only called once per name.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_SUBMODULE_ATTRIBUTES))
\ No newline at end of file
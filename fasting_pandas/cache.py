@@ -0,0 +1,142 @@
+import os
+import uuid
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+
+from .datasets import generate_teamresult_df, generate_testscore_df, set_dtypes_for_teamresult_df
+from .formats import read_arrow_ipc_memory_mapped, write_arrow_ipc_single_batch
+
+DEFAULT_CACHE_DIR = os.environ.get('FASTING_PANDAS_CACHE_DIR',
+                                   os.path.join(os.path.expanduser('~'), '.cache', 'fasting_pandas'))
+CACHE_EXTENSION = '.arrow'
+GENERATORS = {
+    'testscore': generate_testscore_df,
+    'teamresult': generate_teamresult_df,
+}
+
+
+class DatasetCache:
+    """
+    On-disk cache of generated benchmark DataFrames, keyed by (generator, size, seed, optimized).
+
+    Frames are stored as uncompressed Arrow IPC (Feather v2) files and read back through a memory map,
+    so numeric columns are not copied out of the page cache. Files are written to a temporary name and
+    renamed into place, so concurrent processes never read a partial file. Once the files in the
+    directory take more than max_bytes, the least recently used ones are deleted.
+
+    Example:
+        cache = DatasetCache('data/dataset_cache')
+        df = cache.get('teamresult', 10_000_000, optimized=True)
+        cache.stats()
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = 10 * 1024 ** 3):
+        """
+        Args:
+            cache_dir (str, optional): Directory of the cache files. Defaults to $FASTING_PANDAS_CACHE_DIR,
+                or ~/.cache/fasting_pandas.
+            max_bytes (int, optional): Size the cache directory is trimmed to after every write.
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path(self, generator: str, size: int, seed: int, optimized: bool) -> str:
+        """Returns the cache file of a key."""
+        return os.path.join(self.cache_dir,
+                            f"{generator}_{size}_{seed}_{'optimized' if optimized else 'raw'}{CACHE_EXTENSION}")
+
+    def get(self, generator: str = 'teamresult', size: int = 10_000, seed: int = 0,
+            optimized: bool = False, memory_map: bool = True) -> pd.DataFrame:
+        """
+        Returns a generated DataFrame, from the cache if it was generated before.
+
+        Args:
+            generator (str, optional): 'teamresult' or 'testscore'.
+            size (int, optional): Number of rows.
+            seed (int, optional): Seed of the generator. Cached frames are only reproducible with a fixed seed.
+            optimized (bool, optional): Return the team result DataFrame with optimized dtypes. It is
+                converted from the raw frame of the same seed, so both hold the same values.
+            memory_map (bool, optional): Memory-map the file on a hit. Pages are then only read from the
+                page cache when a column is first used, which charges that cost to whatever touches it
+                first, e.g. the first timed write. With False the file is read into memory up front.
+
+        Returns:
+            pd.DataFrame: The frame, memory-mapped on a hit unless memory_map is False.
+        """
+        if generator not in GENERATORS:
+            raise ValueError(f"Unsupported generator: {generator}")
+        if optimized and generator != 'teamresult':
+            raise ValueError(f"The {generator} generator has no optimized variant")
+        file_path = self.path(generator, size, seed, optimized)
+        try:
+            df = read_arrow_ipc_memory_mapped(file_path) if memory_map else pd.read_feather(file_path)
+        except FileNotFoundError:
+            pass
+        else:
+            self.hits += 1
+            # The modification time orders the files for the LRU eviction.
+            os.utime(file_path)
+            return df
+
+        self.misses += 1
+        df = GENERATORS[generator](size, seed=seed)
+        if optimized:
+            df = set_dtypes_for_teamresult_df(df, inplace=True)
+        self._write(df, file_path)
+        self._evict(keep=file_path)
+        return df
+
+    def _write(self, df: pd.DataFrame, file_path: str) -> None:
+        temp_path = f'{file_path}.{uuid.uuid4().hex}.tmp'
+        try:
+            write_arrow_ipc_single_batch(df, temp_path)
+            os.replace(temp_path, file_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _files(self) -> List[Tuple[str, float, int]]:
+        """Returns the path, modification time and size of every cache file."""
+        files = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(CACHE_EXTENSION):
+                    stat = entry.stat()
+                    files.append((entry.path, stat.st_mtime, stat.st_size))
+        return files
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Deletes the least recently used files until the cache fits in max_bytes, never deleting keep."""
+        files = sorted(self._files(), key=lambda file: file[1])
+        total = sum(size for _, _, size in files)
+        for file_path, _, size in files:
+            if total <= self.max_bytes:
+                break
+            if file_path == keep:
+                continue
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                # Already evicted by another process.
+                pass
+            else:
+                self.evictions += 1
+            total -= size
+
+    def clear(self) -> None:
+        """Deletes every cached frame."""
+        for file_path, _, _ in self._files():
+            os.remove(file_path)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hits, misses and evictions of this instance and the current number and size of files."""
+        files = self._files()
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'files': len(files), 'bytes': sum(size for _, _, size in files)}
+
+    def __repr__(self):
+        return f"DatasetCache({self.cache_dir!r}, hits={self.hits}, misses={self.misses})"
@@ -1,32 +1,281 @@
 import pandas as pd
 import sqlite3
 import os
-from time import perf_counter
-from typing import Tuple, Optional, List, Union
+import sys
+import gc
+import tracemalloc
+import statistics
+import json
+import weakref
+import numpy as np
+from time import perf_counter, process_time
+from typing import Callable, Iterator, Tuple, Optional, List, Union
+from pandas.core.indexing import _AtIndexer, _iAtIndexer, _iLocIndexer, _LocIndexer
+
+from .formats import FileFormat, get_format
+from .utils import evict_from_page_cache, summarize_timings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_PROC_STATUS = '/proc/self/status'
+_PROC_CLEAR_REFS = '/proc/self/clear_refs'
+
+
+def _read_proc_status(field: str) -> Optional[int]:
+    """Returns a memory field of /proc/self/status in bytes, or None where /proc is not available."""
+    try:
+        with open(_PROC_STATUS) as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _current_rss() -> Optional[int]:
+    """Returns the resident set size of the process in bytes, if the platform reports it."""
+    return _read_proc_status('VmRSS')
+
+
+def _peak_rss() -> Optional[int]:
+    """Returns the peak resident set size of the process in bytes, if the platform reports it."""
+    peak = _read_proc_status('VmHWM')
+    if peak is None and resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and in kilobytes everywhere else.
+        peak = max_rss if sys.platform == 'darwin' else max_rss * 1024
+    return peak
+
+
+def _reset_peak_rss() -> bool:
+    """Resets the peak resident set size to the current one. Only supported on Linux."""
+    try:
+        with open(_PROC_CLEAR_REFS, 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _max_or_none(values) -> Optional[int]:
+    """Returns the largest value that is not None, or None if there is none."""
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def _gc_collections() -> int:
+    """Returns the number of garbage collections run so far, over all generations."""
+    return sum(stats['collections'] for stats in gc.get_stats())
+
+
+RESULT_COLUMNS = [
+    ('method_name', 'TEXT'),
+    ('class_name', 'TEXT'),
+    ('n_rows', 'INT'),
+    ('n_columns', 'INT'),
+    ('memory_usage', 'FLOAT'),
+    ('memory_usage_detail', 'TEXT'),
+    ('elapsed_time', 'REAL'),
+    ('file_size', 'INT'),
+    ('cpu_time', 'REAL'),
+    ('peak_rss_delta', 'INT'),
+    ('tracemalloc_peak', 'INT'),
+    ('gc_collections', 'INT'),
+    ('samples', 'TEXT'),
+    ('tags', 'TEXT'),
+    ('profile_top', 'TEXT'),
+    ('profile_stats', 'BLOB'),
+    ('latencies', 'TEXT'),
+    ('run_id', 'TEXT'),
+]
+RUN_COLUMNS = [
+    ('run_id', 'TEXT PRIMARY KEY'),
+    ('started_at', 'TEXT'),
+    ('label', 'TEXT'),
+    ('kind', 'TEXT'),
+    ('git_sha', 'TEXT'),
+    ('git_dirty', 'INT'),
+    ('python_version', 'TEXT'),
+    ('pandas_version', 'TEXT'),
+    ('numpy_version', 'TEXT'),
+    ('pyarrow_version', 'TEXT'),
+    ('hostname', 'TEXT'),
+    ('platform', 'TEXT'),
+    ('cpu_count', 'INT'),
+]
+_RESULT_COLUMN_NAMES = ', '.join(name for name, _ in RESULT_COLUMNS)
+_RUN_ID_INDEX = [name for name, _ in RESULT_COLUMNS].index('run_id')
+_INSERT_RESULT = f"INSERT INTO results ({_RESULT_COLUMN_NAMES}) VALUES ({', '.join('?' * len(RESULT_COLUMNS))})"
+
+
+def _create_results_table(cursor: sqlite3.Cursor) -> None:
+    """Creates the results table and its indexes, migrating databases written by older versions."""
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS results ({', '.join(f'{n} {t}' for n, t in RESULT_COLUMNS)})")
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(results)")}
+    for name, column_type in RESULT_COLUMNS:
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE results ADD COLUMN {name} {column_type}")
+    if 'shape' in existing and 'n_rows' not in existing:
+        # Older versions stored the shape as a '(rows, columns)' string.
+        cursor.execute("""
+            UPDATE results SET
+                n_rows = CAST(substr(shape, 2, instr(shape, ',') - 2) AS INTEGER),
+                n_columns = CAST(rtrim(substr(shape, instr(shape, ',') + 1), ')') AS INTEGER)
+            WHERE shape IS NOT NULL
+        """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS results_method_name ON results (method_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS results_shape ON results (n_rows, n_columns)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS results_run_id ON results (run_id)")
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS runs ({', '.join(f'{n} {t}' for n, t in RUN_COLUMNS)})")
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(runs)")}
+    for name, column_type in RUN_COLUMNS:
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE runs ADD COLUMN {name} {column_type}")
 
 
 class TimedContext:
     """
     Context manager that times how long a code block takes to execute.
+
+    Besides the wall time it records the CPU time, the number of garbage collections and how far the
+    resident set size peaked above its value on entry. On platforms where the peak cannot be reset
+    (anything but Linux) only growth above the previous peak of the process is visible.
+    With trace_memory=True it also records the peak of the memory traced by tracemalloc, which is
+    more precise but slows down allocation-heavy code considerably.
     """
 
-    def __init__(self, context_manager):
+    def __init__(self, context_manager, trace_memory: bool = False):
         self.context_manager = context_manager
+        self.trace_memory = trace_memory
+        self.elapsed_time = None
+        self.cpu_time = None
+        self.gc_collections = None
+        self.peak_rss_delta = None
+        self.tracemalloc_peak = None
 
     def __enter__(self):
+        self._gc_collections = _gc_collections()
+        self._peak_rss_was_reset = _reset_peak_rss()
+        self._start_rss = _current_rss()
+        if self._start_rss is None or not self._peak_rss_was_reset:
+            self._start_rss = _peak_rss()
+        if self.trace_memory:
+            self._started_tracemalloc = not tracemalloc.is_tracing()
+            if self._started_tracemalloc:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._start_traced = tracemalloc.get_traced_memory()[0]
+        self.start_cpu_time = process_time()
         self.start_time = perf_counter()
         return self
 
     def __exit__(self, *args):
         self.elapsed_time = perf_counter() - self.start_time
+        self.cpu_time = process_time() - self.start_cpu_time
+        if self.trace_memory:
+            self.tracemalloc_peak = tracemalloc.get_traced_memory()[1] - self._start_traced
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        peak_rss = _peak_rss()
+        if peak_rss is not None and self._start_rss is not None:
+            self.peak_rss_delta = max(0, peak_rss - self._start_rss)
+        self.gc_collections = _gc_collections() - self._gc_collections
+
+
+def _memory_profile(df: pd.DataFrame) -> Tuple[np.ndarray, tuple]:
+    """Returns the deep memory usage of the index and every column of df, and their labels."""
+    detail = df.memory_usage(deep=True)
+    return detail.to_numpy(dtype=np.int64), tuple(detail.index)
+
+
+def _invalidating_indexer(indexer_class: type) -> type:
+    """Returns a subclass of a pandas indexer that drops the memory profile of its TimedPandas before a write."""
+    class Indexer(indexer_class):
+        def __setitem__(self, key, value):
+            self.obj._invalidate_memory_profile()
+            super().__setitem__(key, value)
+
+    Indexer.__name__ = Indexer.__qualname__ = indexer_class.__name__
+    return Indexer
+
+
+_TimedLocIndexer = _invalidating_indexer(_LocIndexer)
+_TimedILocIndexer = _invalidating_indexer(_iLocIndexer)
+_TimedAtIndexer = _invalidating_indexer(_AtIndexer)
+_TimedIAtIndexer = _invalidating_indexer(_iAtIndexer)
 
 
 class TimedPandas(pd.DataFrame):
     """
     Subclass of pandas.DataFrame that times how long a method takes to execute.
     """
-    def time(self, method_name: str, *args, db_path: str = None,
+    # (weak reference to the block manager, ids of its block arrays, values, labels) of the last memory
+    # profile. A class attribute so DataFrame.__setattr__ does not take it for a column; instances set it
+    # with object.__setattr__.
+    _memory_profile_cache = None
+
+    def _memory_profile_key(self) -> tuple:
+        # Setting .columns or .index replaces the axes but keeps the block manager and its arrays.
+        return (id(self._mgr.axes[0]), id(self._mgr.axes[1]), *(id(block.values) for block in self._mgr.blocks))
+
+    def memory_profile(self) -> Tuple[np.ndarray, tuple]:
+        """
+        Returns the deep memory usage of the index and every column, and their labels.
+
+        The profile is computed once and reused while the frame keeps the same block manager, axes and
+        block arrays, which pandas replaces on most mutations. Item assignment, deletion, insert and writes
+        through .loc, .iloc, .at and .iat also drop it. Writes into arrays taken out of the frame, e.g.
+        with .to_numpy(), are not tracked; they are read-only under copy-on-write.
+        """
+        cache = self._memory_profile_cache
+        if cache is not None and cache[0]() is self._mgr and cache[1] == self._memory_profile_key():
+            return cache[2], cache[3]
+        values, labels = _memory_profile(self)
+        object.__setattr__(self, '_memory_profile_cache',
+                           (weakref.ref(self._mgr), self._memory_profile_key(), values, labels))
+        return values, labels
+
+    def _invalidate_memory_profile(self) -> None:
+        object.__setattr__(self, '_memory_profile_cache', None)
+
+    def __setitem__(self, key, value):
+        self._invalidate_memory_profile()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._invalidate_memory_profile()
+        super().__delitem__(key)
+
+    def insert(self, *args, **kwargs):
+        self._invalidate_memory_profile()
+        return super().insert(*args, **kwargs)
+
+    # Indexers that invalidate the memory profile when they write, e.g. tdf.loc[0, 'team'] = 'a' * 100.
+    @property
+    def loc(self):
+        return _TimedLocIndexer('loc', self)
+
+    @property
+    def iloc(self):
+        return _TimedILocIndexer('iloc', self)
+
+    @property
+    def at(self):
+        return _TimedAtIndexer('at', self)
+
+    @property
+    def iat(self):
+        return _TimedIAtIndexer('iat', self)
+
+    def time(self, method_name: str, *args, db_path: str = None, store: Optional['ResultStore'] = None,
              truncate_table: bool = False, is_read_method: bool = False,
+             trace_memory: bool = False, repeat: int = 1, warmup: int = 0,
+             drop_page_cache: bool = False, tags: Optional[dict] = None,
+             method: Optional[Callable] = None, profile: Union[bool, str] = False, profile_top: int = 20,
              **kwargs) -> Tuple:
         """
         Times how long a method takes to execute, and returns the result along with timing information.
@@ -35,56 +284,153 @@ class TimedPandas(pd.DataFrame):
             method_name (str): The name of the method to time.
             *args: Positional arguments to pass to the method.
             db_path (str, optional): Path to a SQLite database where the timing information should be saved.
+            store (ResultStore, optional): Store to save the timing information to instead of db_path.
             truncate_table (bool, optional): Deletes everything from result table before inserting new data.
             is_read_method (bool, optional): Uses the pd library instead of the dataframe to measure reading time.
+            trace_memory (bool, optional): Also record the tracemalloc peak of the call. Slows the call down.
+            repeat (int, optional): Number of timed runs. The elapsed time of the result is their median.
+            warmup (int, optional): Number of untimed runs before the timed ones.
+            drop_page_cache (bool, optional): Evict the file from the OS page cache before every timed read,
+                so cold reads are measured. Only supported where os.posix_fadvise is available.
+            tags (dict, optional): JSON-serializable labels stored with the result, e.g. the file format.
+            method (callable, optional): Function to time instead of looking method_name up on the
+                DataFrame (or on pd for read methods). It is called with *args and **kwargs.
+            profile (bool or str, optional): Profile the timed runs with cProfile (True or 'cprofile') or
+                with the sampling profiler ('sampling'). The profiler overhead is included in the timings.
+                See fasting_pandas.profiling.CallProfile.
+            profile_top (int, optional): Number of the hottest functions kept in TimedResult.profile_top.
             **kwargs: Keyword arguments to pass to the method.
 
         Returns:
-            tuple: A tuple containing the result of the method and a TimedResult object with timing information.
+            tuple: A tuple containing the result of the method (from the last run) and a TimedResult object
+                with timing information.
+
+        Raises:
+            ValueError: If repeat is smaller than 1 or warmup is negative.
         """
+        if repeat < 1:
+            raise ValueError(f"repeat must be at least 1, got {repeat}")
+        if warmup < 0:
+            raise ValueError(f"warmup must not be negative, got {warmup}")
         file_size = None
-        if is_read_method:
-            # df = pd.DataFrame()
-            file_path = args[0]
+        file_path = args[0] if args and isinstance(args[0], (str, os.PathLike)) else None
+        if method is None and is_read_method:
+            method = getattr(pd, method_name)
+        elif method is None:
+            method = getattr(super(), method_name)
+
+        call_profile = None
+        if profile:
+            from .profiling import CallProfile, resolve_profile_mode
+            call_profile = CallProfile(resolve_profile_mode(profile))
+
+        for _ in range(warmup):
+            method(*args, **kwargs)
+        contexts = []
+        for _ in range(repeat):
+            if drop_page_cache and is_read_method and file_path:
+                evict_from_page_cache(file_path)
+            if call_profile is None:
+                with TimedContext(self, trace_memory=trace_memory) as c:
+                    result = method(*args, **kwargs)
+            else:
+                with TimedContext(self, trace_memory=trace_memory) as c, call_profile:
+                    result = method(*args, **kwargs)
+            contexts.append(c)
+
+        # Any method that was given a path to an existing file read or wrote it.
+        if file_path is not None and os.path.isfile(file_path):
             file_size = os.path.getsize(file_path)
-            with TimedContext(self) as c:
-                method = getattr(pd, method_name)
-                result = method(*args, **kwargs)
-            memory_usage = result.memory_usage(deep=True).sum()
-            memory_usage_detail = result.memory_usage(deep=True)
-            # print(result)
+        if is_read_method:
+            memory_usage_detail = _memory_profile(result)
         else:
-            with TimedContext(self) as c:
-                method = getattr(super(), method_name)
-                result = method(*args, **kwargs)
-            if method_name in ['to_csv', 'to_excel', 'to_json', 'to_pickle', 'to_parquet']:
-                file_path = args[0]
-                file_size = os.path.getsize(file_path)
-                # print(file_size)
-            memory_usage = self.memory_usage(deep=True).sum()
-            memory_usage_detail = self.memory_usage(deep=True)
+            memory_usage_detail = self.memory_profile()
+        memory_usage = int(memory_usage_detail[0].sum())
+        samples = [c.elapsed_time for c in contexts]
         timed_result = TimedResult(
             method_name,
             self.__class__.__name__,
             self.shape,
             memory_usage,
             memory_usage_detail,
-            c.elapsed_time,
-            file_size
+            statistics.median(samples),
+            file_size,
+            cpu_time=statistics.median(c.cpu_time for c in contexts),
+            peak_rss_delta=_max_or_none(c.peak_rss_delta for c in contexts),
+            tracemalloc_peak=_max_or_none(c.tracemalloc_peak for c in contexts),
+            gc_collections=sum(c.gc_collections for c in contexts),
+            samples=samples,
+            tags=tags,
+            profile=call_profile,
+            profile_top=None if call_profile is None else call_profile.top_functions(profile_top)
         )
 
-        if db_path:
+        if store is not None:
+            if truncate_table:
+                store.truncate()
+            store.add(timed_result)
+        elif db_path:
             timed_result.save_to_db(db_path, truncate_table=truncate_table)
 
         return result, timed_result
 
+    def time_format(self, file_format: Union[str, FileFormat], file_path: str, read: bool = False,
+                    **time_options) -> Tuple:
+        """
+        Times writing or reading a file with a registered file format variant.
+
+        Args:
+            file_format (str or FileFormat): The variant, or its name in the formats registry.
+            file_path (str): The file to write or read.
+            read (bool, optional): Time reading file_path instead of writing the DataFrame to it.
+            **time_options: Options for time(), e.g. store, repeat or drop_page_cache.
+
+        Returns:
+            tuple: The result of the writer or reader and a TimedResult, named to_<variant> or read_<variant>
+                and tagged with the variant name.
+        """
+        if isinstance(file_format, str):
+            file_format = get_format(file_format)
+        time_options['tags'] = {'file_format': file_format.name, **time_options.get('tags', {})}
+        if read:
+            return self.time(f'read_{file_format.name}', file_path, method=file_format.read,
+                             is_read_method=True, **time_options)
+        return self.time(f'to_{file_format.name}', file_path,
+                         method=lambda path: file_format.write(self, path), **time_options)
+
+
+def _split_memory_detail(memory_usage_detail) -> Tuple[Optional[np.ndarray], tuple]:
+    """Returns a memory usage Series, or a (values, labels) pair, as an int64 array and a tuple of labels."""
+    if memory_usage_detail is None:
+        return None, ()
+    if isinstance(memory_usage_detail, pd.Series):
+        return memory_usage_detail.to_numpy(dtype=np.int64), tuple(memory_usage_detail.index)
+    values, labels = memory_usage_detail
+    return np.asarray(values, dtype=np.int64), tuple(labels)
+
+
+def _load_profile(profile_stats: bytes):
+    from .profiling import CallProfile
+    return CallProfile.from_bytes(profile_stats)
+
 
 class TimedResult:
     """
     Stores timing information about a method call.
+
+    The memory usage detail is kept as an int64 array and a tuple of labels, and only turned into a
+    Series when memory_usage_detail is accessed.
     """
+    __slots__ = ('method_name', 'class_name', 'shape', 'memory_usage', '_memory_detail_values',
+                 '_memory_detail_labels', '_memory_detail_series', 'elapsed_time', 'file_size', 'cpu_time',
+                 'peak_rss_delta', 'tracemalloc_peak', 'gc_collections', 'samples', 'tags', 'profile',
+                 'profile_top', 'latencies', 'run_id')
 
-    def __init__(self, method_name: str, class_name, shape, memory_usage, memory_usage_detail, elapsed_time, file_size):
+    def __init__(self, method_name: str, class_name, shape, memory_usage, memory_usage_detail, elapsed_time, file_size,
+                 cpu_time: Optional[float] = None, peak_rss_delta: Optional[int] = None,
+                 tracemalloc_peak: Optional[int] = None, gc_collections: Optional[int] = None,
+                 samples: Optional[List[float]] = None, tags: Optional[dict] = None, run_id: Optional[str] = None,
+                 profile=None, profile_top: Optional[List[dict]] = None, latencies: Optional[List[float]] = None):
         """
         Initializes a new TimedResult object with the specified timing information.
 
@@ -93,10 +439,21 @@ class TimedResult:
             class_name (str): The name of the class that the method belongs to.
             shape (tuple): The shape of the DataFrame that the method was called on.
             memory_usage (int): The total memory usage of the DataFrame after the method was called.
-            memory_usage_detail (str): The detailed memory usage report of the DataFrame.
+            memory_usage_detail (pd.Series or tuple): The memory usage of every column of the DataFrame,
+                as a Series or a (values, labels) pair.
             elapsed_time (float): The time in seconds that it took for the method to execute.
             file_size (float): The size of the file. Only applies for reading or writing methods.
-            
+            cpu_time (float, optional): The CPU time in seconds spent by the process during the call.
+            peak_rss_delta (int, optional): How many bytes the resident set size peaked above its value before the call.
+            tracemalloc_peak (int, optional): Peak bytes allocated during the call, as traced by tracemalloc.
+            gc_collections (int, optional): Number of garbage collections run during the call.
+            samples (list of float, optional): The elapsed time of every timed run. Defaults to [elapsed_time].
+            tags (dict, optional): Labels describing the call, e.g. the file format or benchmark cell.
+            run_id (str, optional): The benchmark run the result belongs to. See fasting_pandas.runs.
+            profile (CallProfile, optional): The profile of the timed runs, when they were profiled.
+            profile_top (list of dict, optional): The hottest functions of the profile.
+            latencies (list of float, optional): Latencies of the parts of the call, e.g. of every file
+                read by read_files. Unlike samples they are not timings of the whole call.
         """
         self.method_name = method_name
         self.class_name = class_name
@@ -105,6 +462,61 @@ class TimedResult:
         self.memory_usage_detail = memory_usage_detail
         self.elapsed_time = elapsed_time
         self.file_size = file_size
+        self.cpu_time = cpu_time
+        self.peak_rss_delta = peak_rss_delta
+        self.tracemalloc_peak = tracemalloc_peak
+        self.gc_collections = gc_collections
+        self.samples = list(samples) if samples else [elapsed_time]
+        self.tags = dict(tags) if tags else {}
+        self.run_id = run_id
+        self.profile = profile
+        self.profile_top = profile_top
+        self.latencies = list(latencies) if latencies is not None else None
+
+    @property
+    def memory_usage_detail(self) -> Optional[pd.Series]:
+        """The memory usage of every column, built from the compact array on first access."""
+        if self._memory_detail_series is None and self._memory_detail_values is not None:
+            self._memory_detail_series = pd.Series(self._memory_detail_values,
+                                                   index=pd.Index(self._memory_detail_labels, tupleize_cols=False))
+        return self._memory_detail_series
+
+    @memory_usage_detail.setter
+    def memory_usage_detail(self, memory_usage_detail) -> None:
+        self._memory_detail_values, self._memory_detail_labels = _split_memory_detail(memory_usage_detail)
+        self._memory_detail_series = None
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows processed per second of elapsed time."""
+        return self.shape[0] / self.elapsed_time
+
+    @property
+    def mb_per_second(self) -> Optional[float]:
+        """Mebibytes (MiB) of file read or written per second of elapsed time, if there was a file."""
+        if self.file_size is None:
+            return None
+        return self.file_size / 1024 ** 2 / self.elapsed_time
+
+    @property
+    def min_time(self) -> float:
+        """The fastest timed run, in seconds."""
+        return summarize_timings(self.samples)['min']
+
+    @property
+    def median_time(self) -> float:
+        """The median of the timed runs, in seconds."""
+        return summarize_timings(self.samples)['median']
+
+    @property
+    def p95_time(self) -> float:
+        """The 95th percentile of the timed runs, in seconds."""
+        return summarize_timings(self.samples)['p95']
+
+    @property
+    def stdev_time(self) -> float:
+        """The standard deviation of the timed runs, in seconds. Zero for a single run."""
+        return summarize_timings(self.samples)['stdev']
 
     def __repr__(self):
         """
@@ -116,61 +528,87 @@ class TimedResult:
         return f"""Method: {self.method_name}\nClass: {self.class_name}\nShape: {self.shape}\nMemory Usage: {self.memory_usage}
         \nMemory Usage Detail: {self.memory_usage_detail} \nElapsed Time: {self.elapsed_time:.5f} seconds
         \nFile Size: {self.file_size}
+        \nCPU Time: {self.cpu_time} \nPeak RSS Delta: {self.peak_rss_delta}
+        \nTracemalloc Peak: {self.tracemalloc_peak} \nGC Collections: {self.gc_collections}
+        \nRuns: {len(self.samples)} \nMin / Median / P95 / Stdev: {self.min_time:.5f} / {self.median_time:.5f} / {self.p95_time:.5f} / {self.stdev_time:.5f} seconds
         """
 
+    def to_row(self) -> tuple:
+        """Returns the result as a row of the results table, in RESULT_COLUMNS order."""
+        n_rows, n_columns = self.shape
+        return (self.method_name,
+                self.class_name,
+                n_rows,
+                n_columns,
+                float(self.memory_usage),
+                None if self._memory_detail_values is None else json.dumps(
+                    dict(zip(map(str, self._memory_detail_labels), self._memory_detail_values.tolist()))),
+                self.elapsed_time,
+                self.file_size,
+                self.cpu_time,
+                self.peak_rss_delta,
+                self.tracemalloc_peak,
+                self.gc_collections,
+                json.dumps(self.samples),
+                json.dumps(self.tags),
+                None if self.profile_top is None else json.dumps(self.profile_top),
+                None if self.profile is None else self.profile.to_bytes(),
+                None if self.latencies is None else json.dumps(self.latencies),
+                self.run_id)
+
+    @classmethod
+    def from_row(cls, row: tuple) -> 'TimedResult':
+        """Decodes a row of the results table, in RESULT_COLUMNS order."""
+        (method_name, class_name, n_rows, n_columns, memory_usage, memory_usage_str, elapsed_time, file_size,
+         cpu_time, peak_rss_delta, tracemalloc_peak, gc_collections, samples_str, tags_str, profile_top_str,
+         profile_stats, latencies_str, run_id) = row
+        memory_usage_detail = None
+        if memory_usage_str:
+            detail = json.loads(memory_usage_str)
+            memory_usage_detail = (list(detail.values()), tuple(detail))
+        return cls(method_name, class_name, (n_rows, n_columns), memory_usage, memory_usage_detail, elapsed_time,
+                   file_size, cpu_time, peak_rss_delta, tracemalloc_peak, gc_collections,
+                   json.loads(samples_str) if samples_str else None,
+                   json.loads(tags_str) if tags_str else None, run_id,
+                   _load_profile(profile_stats) if profile_stats else None,
+                   json.loads(profile_top_str) if profile_top_str else None,
+                   json.loads(latencies_str) if latencies_str else None)
+
     def save_to_db(self, db_path: str, truncate_table: bool = False):
         """
         Saves the timing information to a SQLite database.
 
+        Opens a connection for this single result. Use a ResultStore to save many results.
+
         Args:
             db_path (str): Path to the SQLite database where the information should be saved.
+            truncate_table (bool, optional): Deletes everything from result table before inserting new data.
         """
-        with sqlite3.connect(db_path) as conn:
-            c = conn.cursor()
-            c.execute("""
-                CREATE TABLE IF NOT EXISTS results (
-                    method_name TEXT,
-                    class_name TEXT,
-                    shape TEXT,
-                    memory_usage FLOAT,
-                    memory_usage_detail TEXT,
-                    elapsed_time REAL,
-                    file_size INT
-                )
-            """)
-            shape_str = str(self.shape).replace("'", '"')
-            memory_usage_str = self.memory_usage_detail.to_json()
+        with ResultStore(db_path) as store:
             if truncate_table:
-                c.execute("DELETE FROM results")
-            c.execute('INSERT INTO results VALUES (?,?,?,?,?,?,?)',
-                      (self.method_name,
-                       self.class_name,
-                       shape_str,
-                       float(self.memory_usage),
-                       memory_usage_str,
-                       self.elapsed_time,
-                       self.file_size)
-                      )
-            conn.commit()
+                store.truncate()
+            store.add(self)
 
     @classmethod
-    def load_from_db(cls, db_path: str, method_name: Optional[str] = None) -> Union[List, Optional[Tuple]]:
-        with sqlite3.connect(db_path) as conn:
-            c = conn.cursor()
+    def load_from_db(cls, db_path: str, method_name: Optional[str] = None) -> Union[Tuple, Optional['TimedResult']]:
+        """
+        Loads timing information from a SQLite database.
+
+        Args:
+            db_path (str): Path to the SQLite database.
+            method_name (str, optional): Only return the first result for this method.
+
+        Returns:
+            The first TimedResult for method_name (or None), or a tuple with every TimedResult when
+            method_name is not given. Use ResultStore.iter_results to stream large tables.
+        """
+        with ResultStore(db_path) as store:
+            results = store.iter_results(method_name)
             if method_name:
-                c.execute('SELECT * FROM results WHERE method_name = ?', (method_name,))
-                result = c.fetchone()
-                if result:
-                    method_name, class_name, shape_str, memory_usage, memory_usage_str, elapsed_time, file_size = result
-                    shape = tuple(map(int, shape_str.strip('()').split(',')))
-                    memory_usage_detail = pd.read_json(memory_usage_str, typ='series')
-                    return (cls(method_name, class_name, shape, memory_usage, memory_usage_detail, elapsed_time, file_size))
-                else:
-                    return None
-            else:
-                c.execute('SELECT * FROM results')
-                results = c.fetchall()
-                return tuple(cls(*result) for result in results)
+                result = next(results, None)
+                results.close()
+                return result
+            return tuple(results)
 
     #     Other possible methods of interest.
     #                                , self.__class__.__name__
@@ -191,3 +629,114 @@ class TimedResult:
     #                             #    , self.index.has_duplicates
     #                             #    , self.columns.has_duplicates
     #                                , self.elapsed_time)
+
+
+class ResultStore:
+    """
+    Batched SQLite storage for TimedResult objects.
+
+    Holds a single connection in WAL mode and inserts results with executemany once batch_size results
+    are buffered or flush_interval seconds have passed since the last flush. Every process should use
+    its own store: WAL lets several processes write to the same database, and a store inherited through
+    fork reconnects (dropping the rows buffered by its parent) the first time it is used in the child.
+    Results added without a run_id are saved under the run_id of the store, if it has one.
+
+    Example:
+        with ResultStore('benchmarks.db') as store:
+            for file_format in file_formats:
+                tdf.time(f'to_{file_format}', path, store=store)
+    """
+
+    def __init__(self, db_path: str, batch_size: int = 100, flush_interval: float = 5.0, timeout: float = 30.0,
+                 run_id: Optional[str] = None):
+        """
+        Args:
+            db_path (str): Path to the SQLite database.
+            batch_size (int, optional): Flush once this many results are buffered.
+            flush_interval (float, optional): Flush when a result is added this many seconds after the last flush.
+            timeout (float, optional): Seconds to wait for another process holding the write lock.
+            run_id (str, optional): The run to save results under, as returned by fasting_pandas.runs.start_run.
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.run_id = run_id
+        self._connection = None
+        self._pid = None
+        self._buffer = []
+        self._last_flush = perf_counter()
+
+    def _forget_parent(self) -> None:
+        """Drops the connection and buffered rows inherited through fork, which belong to the parent."""
+        if self._pid is not None and self._pid != os.getpid():
+            self._connection = None
+            self._pid = None
+            self._buffer = []
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The connection of this process, opened on first use."""
+        self._forget_parent()
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.db_path, timeout=self.timeout)
+            self._pid = os.getpid()
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            with self._connection:
+                _create_results_table(self._connection.cursor())
+        return self._connection
+
+    def add(self, result: TimedResult) -> None:
+        """Buffers a result, flushing the buffer when it is full or the flush interval has passed."""
+        self._forget_parent()
+        row = result.to_row()
+        if result.run_id is None and self.run_id is not None:
+            row = row[:_RUN_ID_INDEX] + (self.run_id,) + row[_RUN_ID_INDEX + 1:]
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size or perf_counter() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered results in a single transaction."""
+        if self._buffer:
+            with self.connection as conn:
+                conn.executemany(_INSERT_RESULT, self._buffer)
+            self._buffer = []
+        self._last_flush = perf_counter()
+
+    def truncate(self) -> None:
+        """Deletes every stored and buffered result."""
+        self._buffer = []
+        with self.connection as conn:
+            conn.execute("DELETE FROM results")
+
+    def iter_results(self, method_name: Optional[str] = None, run_id: Optional[str] = None) -> Iterator[TimedResult]:
+        """Yields the stored results one row at a time, optionally only those of method_name and/or run_id."""
+        self.flush()
+        conditions, params = [], []
+        if method_name:
+            conditions.append('method_name = ?')
+            params.append(method_name)
+        if run_id:
+            conditions.append('run_id = ?')
+            params.append(run_id)
+        query = f'SELECT {_RESULT_COLUMN_NAMES} FROM results'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        for row in self.connection.execute(query, params):
+            yield TimedResult.from_row(row)
+
+    def close(self) -> None:
+        """Flushes the buffered results and closes the connection."""
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = None
+        self._pid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
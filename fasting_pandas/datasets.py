@@ -1,42 +1,204 @@
+from typing import Iterable, Iterator, Optional
 import pandas as pd
 import numpy as np
 
+from .dtypes import categorize, labels_to_bool
 
-def generate_testscore_df(size: int = 10_000) -> pd.DataFrame:
+TESTSCORE_HAPPY_FOODS = ['pizza', 'hamburguer', 'fried-chicken', 'nachos', 'grilled-meat']
+TESTSCORE_SAD_FOODS = ['beef-liver', 'tomatoes', 'broccoli', 'soup', 'beans']
+TEAMRESULT_SIZES = ['big', 'medium', 'small']
+TEAMRESULT_TEAMS = ['yellow', 'cyan', 'magenta', 'violet', 'black']
+TEAMRESULT_RESULTS = ['win', 'lose']
+TEAMRESULT_DATES = pd.date_range('2015-01-01', '2020-12-31')
+
+
+def generate_testscore_df(size: int = 10_000, seed: Optional[int] = None) -> pd.DataFrame:
     """Returns a DataFrame with calculated test scores."""
 
+    rng = np.random.default_rng(seed)
     df = pd.DataFrame()
-    size = 10_000
-    df['age'] = np.random.randint(12, 20, size)
-    df['study_time'] = np.random.randint(0, 11, size)
-    df['test_1_score'] = np.random.rand(size)
-    df['test_2_score'] = np.random.rand(size)
-    df['test_3_score'] = np.random.rand(size)
-    df['happy_food'] = np.random.choice(
-        ['pizza', 'hamburguer', 'fried-chicken', 'nachos', 'grilled-meat'],
-        size)
-    df['sad_food'] = np.random.choice(
-        ['beef-liver', 'tomatoes', 'broccoli', 'soup', 'beans'], size)
+    df['age'] = rng.integers(12, 20, size)
+    df['study_time'] = rng.integers(0, 11, size)
+    df['test_1_score'] = rng.random(size)
+    df['test_2_score'] = rng.random(size)
+    df['test_3_score'] = rng.random(size)
+    df['happy_food'] = rng.choice(TESTSCORE_HAPPY_FOODS, size)
+    df['sad_food'] = rng.choice(TESTSCORE_SAD_FOODS, size)
 
     return df
 
 
-def generate_teamresult_df(size: int = 10_000) -> pd.DataFrame:
-    """Returns a DataFrame with calculated game results."""
+def generate_teamresult_df(size: int = 10_000, optimized: bool = False, seed: Optional[int] = None) -> pd.DataFrame:
+    """Returns a DataFrame with calculated game results.
+
+    With optimized=True the columns are emitted directly in the dtypes produced by
+    set_dtypes_for_teamresult_df, so no object column is ever created.
+    """
+
+    rng = np.random.default_rng(seed)
+    if optimized:
+        return pd.DataFrame(_optimized_teamresult_columns(rng, size))
 
     df = pd.DataFrame()
-    df['size'] = np.random.choice(['big', 'medium', 'small'], size)
-    df['age'] = np.random.randint(1, 50, size)
-    df['team'] = np.random.choice(
-        ['yellow', 'cyan', 'magenta', 'violet', 'black'], size)
-    dates = pd.date_range('2015-01-01', '2020-12-31')
-    df['date'] = np.random.choice(dates, size)
-    df['prob'] = np.random.uniform(0, 1, size)
-    df['result'] = np.random.choice(['win', 'lose'], size)
+    df['size'] = rng.choice(TEAMRESULT_SIZES, size)
+    df['age'] = rng.integers(1, 50, size)
+    df['team'] = rng.choice(TEAMRESULT_TEAMS, size)
+    df['date'] = rng.choice(TEAMRESULT_DATES.values, size)
+    df['prob'] = rng.uniform(0, 1, size)
+    df['result'] = rng.choice(TEAMRESULT_RESULTS, size)
 
     return df
 
 
+def generate_wide_df(size: int = 10_000, n_columns: int = 10, string_width: int = 8, cardinality: int = 100,
+                     optimized: bool = False, seed: Optional[int] = None) -> pd.DataFrame:
+    """Returns a DataFrame of integer, float and string columns in turn, for scaling benchmarks.
+
+    String columns hold `cardinality` distinct labels of `string_width` characters (longer when the
+    cardinality needs more hex digits). With optimized=True integers are int32, floats float32 and
+    strings categorical.
+    """
+
+    rng = np.random.default_rng(seed)
+    labels = np.array([f'{i:0{string_width}x}' for i in range(cardinality)])
+    columns = {}
+    for i in range(n_columns):
+        kind = ('int', 'float', 'str')[i % 3]
+        if kind == 'int':
+            values = rng.integers(0, 1_000_000, size)
+            columns[f'int_{i}'] = values.astype('int32') if optimized else values
+        elif kind == 'float':
+            values = rng.random(size)
+            columns[f'float_{i}'] = values.astype('float32') if optimized else values
+        else:
+            codes = rng.integers(0, cardinality, size)
+            columns[f'str_{i}'] = pd.Categorical.from_codes(codes, categories=labels) if optimized else labels[codes]
+
+    return pd.DataFrame(columns)
+
+
+def _chunk_rng(seed: int, chunk_index: int) -> np.random.Generator:
+    """Returns a random generator that only depends on the seed and the chunk index."""
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk_index,)))
+
+
+def _random_categorical(rng: np.random.Generator, categories: list, size: int) -> pd.Categorical:
+    """Returns a categorical built from random integer codes, without an intermediate string array."""
+    codes = rng.integers(0, len(categories), size, dtype=np.int8)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def _optimized_teamresult_columns(rng: np.random.Generator, size: int) -> dict:
+    """Returns the team result columns with the dtypes of set_dtypes_for_teamresult_df, built from NumPy codes."""
+    return {
+        'size': _random_categorical(rng, TEAMRESULT_SIZES, size),
+        'age': rng.integers(1, 50, size, dtype=np.int8),
+        'team': _random_categorical(rng, TEAMRESULT_TEAMS, size),
+        'date': TEAMRESULT_DATES.values[rng.integers(0, len(TEAMRESULT_DATES), size, dtype=np.int16)],
+        'prob': rng.random(size, dtype=np.float32).astype(np.float16),
+        # 0/1 bytes are valid booleans, so the codes can be viewed as bool without a copy.
+        'win': rng.integers(0, 2, size, dtype=np.uint8).view(np.bool_),
+    }
+
+
+def generate_testscore_chunk(size: int, seed: int, chunk_index: int = 0, offset: int = 0) -> pd.DataFrame:
+    """Returns one reproducible chunk of test scores for the given seed and chunk index."""
+
+    rng = _chunk_rng(seed, chunk_index)
+    index = pd.RangeIndex(offset, offset + size)
+    return pd.DataFrame({
+        'age': rng.integers(12, 20, size),
+        'study_time': rng.integers(0, 11, size),
+        'test_1_score': rng.random(size),
+        'test_2_score': rng.random(size),
+        'test_3_score': rng.random(size),
+        'happy_food': _random_categorical(rng, TESTSCORE_HAPPY_FOODS, size),
+        'sad_food': _random_categorical(rng, TESTSCORE_SAD_FOODS, size),
+    }, index=index)
+
+
+def generate_teamresult_chunk(size: int, seed: int, chunk_index: int = 0, offset: int = 0,
+                              optimized: bool = False) -> pd.DataFrame:
+    """Returns one reproducible chunk of game results for the given seed and chunk index."""
+
+    rng = _chunk_rng(seed, chunk_index)
+    index = pd.RangeIndex(offset, offset + size)
+    if optimized:
+        return pd.DataFrame(_optimized_teamresult_columns(rng, size), index=index)
+    return pd.DataFrame({
+        'size': _random_categorical(rng, TEAMRESULT_SIZES, size),
+        'age': rng.integers(1, 50, size),
+        'team': _random_categorical(rng, TEAMRESULT_TEAMS, size),
+        'date': TEAMRESULT_DATES.values[rng.integers(0, len(TEAMRESULT_DATES), size)],
+        'prob': rng.uniform(0, 1, size),
+        'result': _random_categorical(rng, TEAMRESULT_RESULTS, size),
+    }, index=index)
+
+
+def _iter_chunks(chunk_generator, size: int, chunk_size: int, seed: Optional[int],
+                 **kwargs) -> Iterator[pd.DataFrame]:
+    """Yields chunks from chunk_generator until size rows have been produced."""
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    for chunk_index, offset in enumerate(range(0, size, chunk_size)):
+        yield chunk_generator(min(chunk_size, size - offset), seed, chunk_index, offset, **kwargs)
+
+
+def iter_testscore_df(size: int = 10_000, chunk_size: int = 1_000_000,
+                      seed: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """Yields the test score DataFrame in chunks of at most chunk_size rows.
+
+    Every chunk is seeded from (seed, chunk index), so chunk N can be regenerated with
+    generate_testscore_chunk without producing the chunks before it.
+    """
+    return _iter_chunks(generate_testscore_chunk, size, chunk_size, seed)
+
+
+def iter_teamresult_df(size: int = 10_000, chunk_size: int = 1_000_000,
+                       seed: Optional[int] = None, optimized: bool = False) -> Iterator[pd.DataFrame]:
+    """Yields the team result DataFrame in chunks of at most chunk_size rows.
+
+    Every chunk is seeded from (seed, chunk index), so chunk N can be regenerated with
+    generate_teamresult_chunk without producing the chunks before it. With optimized=True the
+    chunks use the compact dtypes of set_dtypes_for_teamresult_df.
+    """
+    return _iter_chunks(generate_teamresult_chunk, size, chunk_size, seed, optimized=optimized)
+
+
+def write_chunks(chunks: Iterable[pd.DataFrame], file_path: str, file_format: str = 'parquet') -> int:
+    """Writes DataFrame chunks to a single csv or parquet file and returns the number of rows written.
+
+    Parquet chunks are appended as row groups and csv chunks are appended below a single header,
+    so only one chunk is held in memory at a time.
+    """
+    if file_format not in ('csv', 'parquet'):
+        raise ValueError(f"Unsupported file format: {file_format}")
+
+    if file_format == 'parquet':
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+    rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            if file_format == 'parquet':
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(file_path, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(file_path, mode='w' if rows == 0 else 'a', header=rows == 0, index=False)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    return rows
+
+
 def set_dtypes_for_teamresult_df(df_input: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
     """Optimizes the datatypes for the team result DataFrame."""
     # Create a copy of the DataFrame to avoid affecting the original
@@ -44,10 +206,10 @@ def set_dtypes_for_teamresult_df(df_input: pd.DataFrame, inplace: bool = False)
         df_output = df_input.copy()
     else:
         df_output = df_input
-    df_output['size'] = df_output['size'].astype('category')
+    df_output['size'] = categorize(df_output['size'])
     df_output['age'] = df_output['age'].astype('int8')
-    df_output['team'] = df_output['team'].astype('category')
-    df_output['win'] = df_output['result'].map({'win': True, 'lose': False})
+    df_output['team'] = categorize(df_output['team'])
+    df_output['win'] = labels_to_bool(df_output['result'], 'win', 'lose')
     df_output['prob'] = df_output['prob'].astype('float16')
     df_output.drop(columns='result', inplace=True)
 
@@ -0,0 +1,318 @@
+from typing import Iterable, List, Optional, Tuple, Union
+import warnings
+import pandas as pd
+import numpy as np
+from pandas.tseries.api import guess_datetime_format
+
+BOOLEAN_LABELS = [('true', 'false'), ('yes', 'no'), ('y', 'n'), ('t', 'f'), ('win', 'lose')]
+INTEGER_DTYPES = ['int8', 'uint8', 'int16', 'uint16', 'int32', 'uint32', 'int64', 'uint64']
+FLOAT_DTYPES = ['float16', 'float32']
+DATE_SEPARATORS = ('-', '/', ':')
+
+
+def _is_string_column(dtype) -> bool:
+    """Returns True for object and pandas string columns."""
+    return dtype == object or isinstance(dtype, pd.StringDtype)
+
+
+def categorize(series: pd.Series, sort: bool = True) -> pd.Series:
+    """
+    Converts a low-cardinality column to a categorical with a single hashing pass over its values.
+
+    pd.factorize hashes object columns in C and dictionary-encodes Arrow-backed string columns, so only the
+    distinct values are sorted and the codes are used as they are, instead of the extra passes of
+    astype('category').
+
+    Args:
+        series (pd.Series): The column to convert.
+        sort (bool, optional): Sort the categories, as astype('category') does. Otherwise they are in order
+            of first appearance.
+
+    Returns:
+        pd.Series: The categorical column. Missing values stay missing.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    codes, uniques = pd.factorize(series)
+    if uniques.dtype == object:
+        # Infer the dtype of the categories the way astype('category') does, e.g. str on pandas 3.
+        uniques = pd.Index(list(uniques))
+    if sort and len(uniques) > 1:
+        order = uniques.argsort()
+        # The extra -1 keeps missing values (code -1) missing after the recoding.
+        recode = np.empty(len(order) + 1, dtype=codes.dtype)
+        recode[order] = np.arange(len(order))
+        recode[-1] = -1
+        codes, uniques = recode[codes], uniques.take(order)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=uniques), index=series.index, name=series.name)
+
+
+def labels_to_bool(series: pd.Series, true_values: Union[str, List[str]] = 'win',
+                   false_values: Union[str, List[str]] = 'lose') -> pd.Series:
+    """
+    Converts a column of binary labels, e.g. 'win' and 'lose', to bool by looking up the distinct labels only.
+
+    Raises:
+        ValueError: If the column has missing values or labels that are neither true nor false values.
+    """
+    true_values = [true_values] if isinstance(true_values, str) else list(true_values)
+    false_values = [false_values] if isinstance(false_values, str) else list(false_values)
+    codes, uniques = pd.factorize(series)
+    is_true = np.asarray(uniques.isin(true_values), dtype=bool)
+    if (codes == -1).any() or not (is_true | np.asarray(uniques.isin(false_values), dtype=bool)).all():
+        raise ValueError(f"Column {series.name!r} has values that are not boolean labels")
+    return pd.Series(is_true[codes], index=series.index, name=series.name)
+
+
+def parse_dates_cached(series: pd.Series, format: Optional[str] = None) -> pd.Series:
+    """
+    Parses a column of date strings once per distinct value and broadcasts the result by the factorized codes.
+
+    Much faster than pd.to_datetime over every row when dates repeat, e.g. ~2,200 distinct days in
+    10 million rows.
+
+    Args:
+        series (pd.Series): The date strings.
+        format (str, optional): strftime format of the dates, e.g. '%Y-%m-%d'. Inferred when omitted.
+
+    Returns:
+        pd.Series: The parsed datetimes, NaT where the value was missing.
+
+    Raises:
+        ValueError: If a value cannot be parsed.
+    """
+    codes, uniques = pd.factorize(series)
+    parsed = pd.DatetimeIndex(pd.to_datetime(uniques, format=format, errors='raise'))
+    return pd.Series(parsed.take(codes, allow_fill=True, fill_value=pd.NaT), index=series.index, name=series.name)
+
+
+class ColumnProfile:
+    """
+    Accumulates the statistics needed to pick the most compact dtype for one column.
+
+    A profile can be updated with the whole column, a sample of it or a stream of chunks,
+    and resolve() returns the target dtype, or None if the column should be left alone.
+    """
+
+    def __init__(self, name, float_rtol: float = 1e-6, category_ratio: float = 0.5,
+                 max_categories: int = 10_000, parse_dates: bool = True,
+                 bool_labels: Iterable[Tuple[str, str]] = BOOLEAN_LABELS):
+        """
+        Args:
+            name: The column name.
+            float_rtol (float): Relative error allowed when downcasting floats.
+            category_ratio (float): Maximum ratio of distinct values to rows for a string column to become a category.
+            max_categories (int): Stop tracking distinct values once a column has more than this many.
+            parse_dates (bool): Whether string columns that look like dates should become datetimes.
+            bool_labels (list of tuple): (true_label, false_label) pairs, compared case-insensitively.
+        """
+        self.name = name
+        self.float_rtol = float_rtol
+        self.category_ratio = category_ratio
+        self.max_categories = max_categories
+        self.parse_dates = parse_dates
+        self.bool_labels = list(bool_labels)
+        self.kind = None
+        self.rows = 0
+        self.nulls = 0
+        self.min = None
+        self.max = None
+        self.float_fits = {dtype: True for dtype in FLOAT_DTYPES}
+        self.uniques = set()
+        self.too_many_uniques = False
+        self.date_candidates = []
+        self.date_format = None
+        self.true_values = []
+        self.false_values = []
+
+    def update(self, series: pd.Series, sample: Optional[pd.Series] = None) -> 'ColumnProfile':
+        """
+        Adds a column, or a chunk of it, to the profile.
+
+        Args:
+            series (pd.Series): The values to profile. Value ranges are always taken from it.
+            sample (pd.Series, optional): A sample of series used for the costlier checks
+                (float precision, distinct values and date parsing).
+        """
+        dtype = series.dtype
+        if sample is None:
+            sample = series
+        if isinstance(dtype, np.dtype) and dtype.kind in 'iu':
+            kind = 'integer'
+        elif isinstance(dtype, np.dtype) and dtype.kind == 'f':
+            kind = 'float'
+        elif _is_string_column(dtype):
+            kind = 'string'
+        else:
+            kind = 'other'
+        if self.kind is None:
+            self.kind = kind
+        elif {self.kind, kind} == {'integer', 'float'}:
+            # Chunks of an integer column with missing values are read as floats.
+            self.kind = 'float'
+        elif self.kind != kind:
+            self.kind = 'other'
+        self.rows += len(sample)
+
+        if self.kind in ('integer', 'float') and len(series):
+            values = series.to_numpy()
+            chunk_min, chunk_max = np.nanmin(values), np.nanmax(values)
+            self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+            self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+        if self.kind == 'float':
+            values = sample.to_numpy()
+            for float_dtype in FLOAT_DTYPES:
+                if self.float_fits[float_dtype]:
+                    with np.errstate(over='ignore'):
+                        downcast = values.astype(float_dtype)
+                    self.float_fits[float_dtype] = bool(np.allclose(
+                        downcast, values, rtol=self.float_rtol, atol=0, equal_nan=True))
+        elif self.kind == 'string':
+            self.nulls += int(sample.isna().sum())
+            uniques = pd.unique(sample.dropna().to_numpy())
+            if len(self.date_candidates) < 1_000:
+                self.date_candidates.extend(uniques[:1_000 - len(self.date_candidates)])
+            if not self.too_many_uniques:
+                self.uniques.update(uniques)
+                if len(self.uniques) > self.max_categories:
+                    self.too_many_uniques = True
+                    self.uniques = set()
+
+        return self
+
+    def _resolve_integer(self) -> Optional[str]:
+        for dtype in INTEGER_DTYPES:
+            info = np.iinfo(dtype)
+            if info.min <= self.min and self.max <= info.max:
+                return dtype
+        return None
+
+    def _resolve_float(self) -> Optional[str]:
+        for dtype in FLOAT_DTYPES:
+            largest = max(abs(self.min), abs(self.max))
+            if self.float_fits[dtype] and (np.isnan(largest) or largest <= np.finfo(dtype).max):
+                return dtype
+        return None
+
+    def _is_boolean(self) -> bool:
+        if self.nulls or self.too_many_uniques or not 0 < len(self.uniques) <= 2:
+            return False
+        if not all(isinstance(value, str) for value in self.uniques):
+            return False
+        labels = {value.lower() for value in self.uniques}
+        for true_label, false_label in self.bool_labels:
+            if labels <= {true_label, false_label}:
+                self.true_values = [value for value in self.uniques if value.lower() == true_label]
+                self.false_values = [value for value in self.uniques if value.lower() == false_label]
+                return True
+        return False
+
+    def _is_date(self) -> bool:
+        candidates = self.date_candidates
+        if not candidates or not all(isinstance(value, str) for value in candidates):
+            return False
+        if not all(any(separator in value for separator in DATE_SEPARATORS) for value in candidates):
+            return False
+        # Only strings in one recognizable format are dates; dateutil would also accept e.g. product codes.
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            formats = {guess_datetime_format(value) for value in candidates}
+        if len(formats) != 1 or None in formats:
+            return False
+        date_format = formats.pop()
+        try:
+            pd.to_datetime(pd.Series(candidates), format=date_format, errors='raise')
+        except (ValueError, TypeError, OverflowError):
+            return False
+        self.date_format = date_format
+        return True
+
+    def resolve(self) -> Optional[str]:
+        """Returns the most compact dtype for the profiled column, or None to leave it as is."""
+        if self.kind == 'integer' and self.min is not None:
+            return self._resolve_integer()
+        if self.kind == 'float' and self.min is not None:
+            return self._resolve_float()
+        if self.kind == 'string' and self.rows:
+            if self._is_boolean():
+                return 'bool'
+            if self.parse_dates and self._is_date():
+                return 'datetime64[ns]'
+            if not self.too_many_uniques and len(self.uniques) / self.rows <= self.category_ratio:
+                return 'category'
+        return None
+
+
+def convert_column(series: pd.Series, target: str, profile: Optional[ColumnProfile] = None) -> pd.Series:
+    """
+    Converts a column to the dtype resolved by its profile.
+
+    Raises:
+        ValueError: If the values outside the profiled sample do not fit the target dtype.
+    """
+    if target == 'bool':
+        return labels_to_bool(series, profile.true_values, profile.false_values)
+    if target == 'datetime64[ns]':
+        return parse_dates_cached(series, None if profile is None else profile.date_format)
+    if target == 'category':
+        return categorize(series)
+    if target in FLOAT_DTYPES:
+        with np.errstate(over='ignore'):
+            converted = series.astype(target)
+        if np.isinf(converted.to_numpy()).sum() != np.isinf(series.to_numpy()).sum():
+            raise ValueError(f"Column {series.name!r} overflows {target}")
+        return converted
+    return series.astype(target)
+
+
+def optimize_dtypes(df_input: pd.DataFrame, inplace: bool = False, sample: Optional[int] = None,
+                    columns: Optional[List] = None, **profile_options) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Downcasts numbers and categorizes strings of any DataFrame in a single pass over its columns.
+
+    Integers get the smallest integer type holding their range, floats the smallest float type within
+    float_rtol, low-cardinality strings become categories, boolean-like pairs become bool and date-like
+    strings become datetimes. Columns are replaced one at a time, so no full copy of the frame is made
+    even when inplace is False.
+
+    Args:
+        df_input (pd.DataFrame): The DataFrame to optimize.
+        inplace (bool, optional): Replace the columns of df_input instead of a shallow copy of it.
+        sample (int, optional): Decide dtypes from a random sample of this many rows. Value ranges and
+            conversions are still checked against the full column.
+        columns (list, optional): Only optimize these columns.
+        **profile_options: Options for ColumnProfile (float_rtol, category_ratio, max_categories,
+            parse_dates, bool_labels).
+
+    Returns:
+        tuple: The optimized DataFrame and a per-column report with dtype_before, dtype_after,
+            memory_before and memory_after, indexed like DataFrame.memory_usage so the memory columns
+            can be passed to calculate_percentage_difference.
+    """
+    df_output = df_input if inplace else df_input.copy(deep=False)
+    sample_index = None
+    if sample is not None and sample < len(df_output):
+        sample_index = np.sort(np.random.default_rng(0).choice(len(df_output), sample, replace=False))
+
+    index_memory = df_output.index.memory_usage(deep=True)
+    report = {'Index': (str(df_output.index.dtype), str(df_output.index.dtype), index_memory, index_memory)}
+    for column in df_output.columns:
+        series = df_output[column]
+        memory_before = series.memory_usage(index=False, deep=True)
+        dtype_before = str(series.dtype)
+        if columns is None or column in columns:
+            column_sample = None if sample_index is None else series.iloc[sample_index]
+            profile = ColumnProfile(column, **profile_options).update(series, column_sample)
+            target = profile.resolve()
+            if target is not None and target != dtype_before:
+                try:
+                    df_output[column] = convert_column(series, target, profile)
+                except (ValueError, TypeError, OverflowError):
+                    pass
+            series = df_output[column]
+        report[column] = (dtype_before, str(series.dtype), memory_before,
+                          series.memory_usage(index=False, deep=True))
+
+    report = pd.DataFrame.from_dict(
+        report, orient='index', columns=['dtype_before', 'dtype_after', 'memory_before', 'memory_after'])
+    return df_output, report
@@ -0,0 +1,483 @@
+import asyncio
+import glob
+import json
+import os
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+
+from .core import ResultStore, TimedContext, TimedResult, _max_or_none, _memory_profile
+from .datasets import set_dtypes_for_teamresult_df
+from .dtypes import ColumnProfile, labels_to_bool, optimize_dtypes
+
+SCHEMA_SUFFIX = '.schema.json'
+# A chunk is held as parsed, as transformed and as an Arrow table at the same time.
+CHUNK_MEMORY_OVERHEAD = 3
+PROBE_ROWS = 10_000
+
+
+def _schema_cache_key(file_path: str, options: dict) -> dict:
+    """Returns what a cached schema must match to be reused: the file size, its mtime and the options."""
+    stat = os.stat(file_path)
+    return {'file_size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'options': options}
+
+
+def _load_cached_schema(cache_path: str, key: dict) -> Optional[dict]:
+    try:
+        with open(cache_path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('key') != key:
+        return None
+    return cached['schema']
+
+
+def _schema_from_profiles(profiles: List[ColumnProfile], complete: bool = True) -> dict:
+    """
+    Turns resolved column profiles into pd.read_csv keyword arguments.
+
+    Unless the profiles are complete, numbers are left out and boolean label columns are read as categories,
+    since a value outside the sample would not fit them.
+    """
+    schema = {'usecols': [profile.name for profile in profiles], 'dtype': {}, 'parse_dates': []}
+    targets = {profile.name: profile.resolve() if complete or profile.kind not in ('integer', 'float') else None
+               for profile in profiles}
+    if not complete:
+        targets = {name: 'category' if target == 'bool' else target for name, target in targets.items()}
+
+    # read_csv applies true_values/false_values to every column, so boolean labels are only
+    # used when no other string column could contain them.
+    true_values, false_values = set(), set()
+    for profile in profiles:
+        if targets[profile.name] == 'bool':
+            labels = set(profile.true_values) | set(profile.false_values)
+            others = [other for other in profiles if other is not profile and other.kind == 'string']
+            if any(other.too_many_uniques or labels & other.uniques for other in others):
+                targets[profile.name] = 'category'
+            else:
+                true_values.update(profile.true_values)
+                false_values.update(profile.false_values)
+
+    for name, target in targets.items():
+        if target == 'datetime64[ns]':
+            schema['parse_dates'].append(name)
+        elif target is not None:
+            schema['dtype'][name] = target
+    if true_values:
+        schema['true_values'] = sorted(true_values)
+        schema['false_values'] = sorted(false_values)
+
+    return schema
+
+
+def infer_read_schema(file_path: str, sample_rows: Optional[int] = 100_000, full_scan: bool = False,
+                      chunksize: int = 1_000_000, usecols: Optional[List[str]] = None, cache: bool = True,
+                      **profile_options) -> dict:
+    """
+    Infers compact dtypes for a csv file and returns them as pd.read_csv keyword arguments.
+
+    The file is profiled with the same rules as optimize_dtypes, either from its first sample_rows rows
+    or, with full_scan=True, from every row in chunks of chunksize rows so memory stays bounded.
+    read_csv wraps integers and overflows floats that do not fit a dtype without raising, so a schema
+    inferred from a sample that does not cover the whole file leaves the numeric columns out: they are
+    parsed as 64-bit and read_csv_optimized downcasts them once every value is known. Boolean label
+    columns are read as categories for the same reason, as a label outside the sample would make read_csv
+    raise. A full scan gives dtypes that always fit, so they are applied while parsing.
+
+    Args:
+        file_path (str): The csv file to profile.
+        sample_rows (int, optional): Number of leading rows to profile when not doing a full scan.
+        full_scan (bool, optional): Profile the whole file in chunks.
+        chunksize (int, optional): Rows per chunk for a full scan.
+        usecols (list of str, optional): Only profile and read these columns.
+        cache (bool, optional): Reuse and write a JSON sidecar next to the file, keyed by its size and mtime.
+        **profile_options: Options for ColumnProfile (float_rtol, category_ratio, max_categories,
+            parse_dates, bool_labels).
+
+    Returns:
+        dict: The usecols, dtype and parse_dates arguments for pd.read_csv, plus true_values and
+            false_values when boolean label columns were found.
+    """
+    options = {'sample_rows': None if full_scan else sample_rows, 'usecols': usecols, **profile_options}
+    cache_path = file_path + SCHEMA_SUFFIX
+    if cache:
+        key = json.loads(json.dumps(_schema_cache_key(file_path, options)))
+        schema = _load_cached_schema(cache_path, key)
+        if schema is not None:
+            return schema
+
+    if full_scan:
+        chunks = pd.read_csv(file_path, usecols=usecols, chunksize=chunksize)
+    else:
+        chunks = [pd.read_csv(file_path, usecols=usecols, nrows=sample_rows)]
+    profiles = None
+    rows = 0
+    for chunk in chunks:
+        if profiles is None:
+            profiles = [ColumnProfile(column, **profile_options) for column in chunk.columns]
+        for profile in profiles:
+            profile.update(chunk[profile.name])
+        rows += len(chunk)
+    covers_file = full_scan or sample_rows is None or rows < sample_rows
+    schema = _schema_from_profiles(profiles or [], complete=covers_file)
+
+    if cache:
+        with open(cache_path, 'w') as f:
+            json.dump({'key': key, 'schema': schema}, f)
+
+    return schema
+
+
+def _categories_to_bool(df: pd.DataFrame, columns: List[str]) -> None:
+    """Converts the categorical columns whose categories are a pair of boolean labels to bool, in place."""
+    for column in columns:
+        series = df[column]
+        if len(series.cat.categories) > 2 or series.hasnans:
+            continue
+        profile = ColumnProfile(column, parse_dates=False).update(pd.Series(series.cat.categories))
+        if profile.resolve() == 'bool':
+            df[column] = labels_to_bool(series, profile.true_values, profile.false_values)
+
+
+def read_csv_optimized(file_path: str, schema: Optional[dict] = None, sample_rows: Optional[int] = 100_000,
+                       full_scan: bool = False, cache: bool = True, **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Reads a csv file straight into compact dtypes, so object columns are never materialized.
+
+    Numeric columns the schema leaves out, because it was inferred from a sample, are downcast after
+    reading from the range of all of their values, and categorical columns holding only a pair of
+    boolean labels are converted to bool.
+
+    Args:
+        file_path (str): The csv file to read.
+        schema (dict, optional): A schema from infer_read_schema. Inferred (and cached) when omitted.
+        sample_rows, full_scan, cache: See infer_read_schema.
+        **read_csv_kwargs: Extra pd.read_csv arguments. They take precedence over the schema.
+
+    Returns:
+        pd.DataFrame: The loaded DataFrame.
+    """
+    if schema is None:
+        schema = infer_read_schema(file_path, sample_rows=sample_rows, full_scan=full_scan,
+                                   usecols=read_csv_kwargs.get('usecols'), cache=cache)
+
+    kwargs = {**schema, **read_csv_kwargs}
+    df = pd.read_csv(file_path, **kwargs)
+    typed = kwargs.get('dtype') or {}
+    # A single dtype for every column was chosen by the caller.
+    numeric = [column for column, dtype in df.dtypes.items()
+               if isinstance(typed, dict) and column not in typed
+               and isinstance(dtype, np.dtype) and dtype.kind in 'iuf']
+    if numeric:
+        df, _ = optimize_dtypes(df, inplace=True, columns=numeric)
+    if 'dtype' not in read_csv_kwargs:
+        _categories_to_bool(df, [column for column, dtype in typed.items() if dtype == 'category' and column in df])
+
+    return df
+
+
+def _teamresult_transform(chunk: pd.DataFrame) -> pd.DataFrame:
+    return set_dtypes_for_teamresult_df(chunk, inplace=True)
+
+
+def _estimate_chunk_rows(csv_path: str, memory_limit: int, read_csv_kwargs: dict) -> Tuple[int, float]:
+    """Returns how many rows fit in memory_limit and the average size of a row on disk, from a probe read."""
+    probe = pd.read_csv(csv_path, nrows=PROBE_ROWS, **read_csv_kwargs)
+    memory_per_row = max(probe.memory_usage(deep=True).sum() / max(len(probe), 1), 1)
+    with open(csv_path, 'rb') as f:
+        lines = [line for _, line in zip(range(len(probe) + 1), f)]
+    disk_per_row = max(sum(map(len, lines[1:])) / max(len(lines) - 1, 1), 1)
+    chunk_rows = int(memory_limit / (memory_per_row * CHUNK_MEMORY_OVERHEAD))
+    if chunk_rows < 1:
+        raise ValueError(f"memory_limit of {memory_limit} bytes is smaller than a single row")
+    return chunk_rows, disk_per_row
+
+
+def _pyarrow_convert_options(read_csv_kwargs: dict):
+    """Maps the usecols, dtype and parse_dates arguments of pd.read_csv to pyarrow ConvertOptions."""
+    import pyarrow as pa
+    import pyarrow.csv as pv
+
+    unsupported = set(read_csv_kwargs) - {'usecols', 'dtype', 'parse_dates'}
+    if unsupported:
+        raise ValueError(f"read_csv_kwargs {sorted(unsupported)} are not supported with engine='pyarrow'")
+    dtype = read_csv_kwargs.get('dtype') or {}
+    parse_dates = read_csv_kwargs.get('parse_dates') or []
+    if not isinstance(dtype, dict) or not isinstance(parse_dates, list):
+        raise ValueError("engine='pyarrow' needs dtype as a dict and parse_dates as a list of columns")
+
+    column_types = {}
+    for column, column_dtype in dtype.items():
+        if column_dtype == 'category':
+            column_types[column] = pa.dictionary(pa.int32(), pa.string())
+        else:
+            column_types[column] = pa.from_numpy_dtype(np.dtype(column_dtype))
+    # Parse dates in the resolution read_csv gives them, so both engines write the same schema.
+    unit, _ = np.datetime_data(pd.to_datetime(pd.Series(['2000-01-01'])).dtype)
+    for column in parse_dates:
+        column_types[column] = pa.timestamp(unit)
+
+    return pv.ConvertOptions(include_columns=read_csv_kwargs.get('usecols'), column_types=column_types)
+
+
+def _rebatch(batches, chunk_rows: int) -> Iterator:
+    """Regroups Arrow record batches into tables of exactly chunk_rows rows, apart from the last one."""
+    import pyarrow as pa
+
+    pending, pending_rows = [], 0
+    for batch in batches:
+        while len(batch):
+            take = min(chunk_rows - pending_rows, len(batch))
+            pending.append(batch.slice(0, take))
+            pending_rows += take
+            batch = batch.slice(take)
+            if pending_rows == chunk_rows:
+                yield pa.Table.from_batches(pending)
+                pending, pending_rows = [], 0
+    if pending:
+        yield pa.Table.from_batches(pending)
+
+
+def _iter_csv_chunks(csv_path: str, chunk_rows: int, disk_per_row: float, engine: str,
+                     read_csv_kwargs: dict) -> Iterator[pd.DataFrame]:
+    if engine == 'pyarrow':
+        import pyarrow.csv as pv
+        convert_options = _pyarrow_convert_options(read_csv_kwargs)
+        # Blocks of about one chunk, regrouped so every chunk (and row group) has chunk_rows rows.
+        read_options = pv.ReadOptions(block_size=max(int(chunk_rows * disk_per_row), 1 << 20))
+        with pv.open_csv(csv_path, read_options=read_options, convert_options=convert_options) as reader:
+            for table in _rebatch(reader, chunk_rows):
+                yield table.to_pandas(date_as_object=False)
+    elif engine == 'pandas':
+        with pd.read_csv(csv_path, chunksize=chunk_rows, **read_csv_kwargs) as reader:
+            yield from reader
+    else:
+        raise ValueError(f"Unsupported engine: {engine}")
+
+
+def _unify_categories(chunk: pd.DataFrame, categories: Dict[str, list]) -> None:
+    """Recodes the categorical columns of chunk onto the categories seen so far, appending new ones."""
+    for column, dtype in chunk.dtypes.items():
+        if not isinstance(dtype, pd.CategoricalDtype):
+            continue
+        known = categories.setdefault(column, [])
+        known_set = set(known)
+        known.extend(category for category in dtype.categories if category not in known_set)
+        if list(dtype.categories) != known:
+            chunk[column] = chunk[column].cat.set_categories(known)
+
+
+def convert_csv_to_parquet(csv_path: str, parquet_path: str, transform: Optional[Callable] = None,
+                           chunksize: Optional[int] = None, memory_limit: Optional[int] = None,
+                           engine: str = 'pandas', categories: Optional[Dict[str, list]] = None,
+                           read_csv_kwargs: Optional[dict] = None, compression: str = 'snappy',
+                           db_path: Optional[str] = None, store: Optional[ResultStore] = None) -> TimedResult:
+    """
+    Converts a csv file to parquet one chunk at a time, so the whole raw frame is never in memory.
+
+    Every chunk is read, passed through transform (the team result dtype mapping of
+    set_dtypes_for_teamresult_df by default) and appended to the parquet file as a row group.
+    Categorical columns keep one dictionary across chunks: categories first seen in a later chunk are
+    appended to it, so codes written earlier stay valid.
+
+    Args:
+        csv_path (str): The csv file to convert.
+        parquet_path (str): The parquet file to write.
+        transform (callable, optional): Takes a chunk and returns it with optimized dtypes.
+        chunksize (int, optional): Rows per chunk. Derived from memory_limit when omitted, else 1,000,000.
+        memory_limit (int, optional): Bytes the chunks may use, estimated from a probe read of the first rows.
+        engine (str, optional): 'pandas' (read_csv with chunksize) or 'pyarrow' (pyarrow's streaming csv reader).
+            Both write row groups of chunksize rows with the same schema. The pyarrow engine only supports
+            the usecols, dtype and parse_dates read_csv arguments.
+        categories (dict, optional): Known categories per column, e.g. {'team': [...]}, to fix their order.
+        read_csv_kwargs (dict, optional): Extra pd.read_csv arguments. Defaults to parsing the date column.
+        compression (str, optional): Parquet compression codec.
+        db_path (str, optional): Path to a SQLite database where the timing information should be saved.
+        store (ResultStore, optional): Store to save the timing information to instead of db_path.
+
+    Returns:
+        TimedResult: The timing of the whole conversion. file_size is the size of the csv file, so
+            rows_per_second and mb_per_second give the throughput, and memory_usage is the largest chunk.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if transform is None:
+        transform = _teamresult_transform
+    if read_csv_kwargs is None:
+        read_csv_kwargs = {'parse_dates': ['date']}
+    categories = {column: list(values) for column, values in (categories or {}).items()}
+    disk_per_row = 1.0
+    if chunksize is None and memory_limit is not None:
+        chunksize, disk_per_row = _estimate_chunk_rows(csv_path, memory_limit, read_csv_kwargs)
+    elif chunksize is None:
+        chunksize = 1_000_000
+
+    rows = 0
+    n_columns = 0
+    largest_chunk = pd.Series(dtype='int64')
+    writer = None
+    schema = None
+    with TimedContext(None) as c:
+        try:
+            for chunk in _iter_csv_chunks(csv_path, chunksize, disk_per_row, engine, read_csv_kwargs):
+                chunk = transform(chunk)
+                _unify_categories(chunk, categories)
+                if schema is None:
+                    # Dictionaries get 32 bit indices, so they can grow in later chunks without
+                    # changing the schema of the file.
+                    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                    schema = pa.schema([
+                        field.with_type(pa.dictionary(pa.int32(), field.type.value_type, field.type.ordered))
+                        if pa.types.is_dictionary(field.type) else field
+                        for field in schema], metadata=schema.metadata)
+                    writer = pq.ParquetWriter(parquet_path, schema, compression=compression)
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+                memory_usage = chunk.memory_usage(index=False, deep=True)
+                if memory_usage.sum() > largest_chunk.sum():
+                    largest_chunk = memory_usage
+                rows += len(chunk)
+                n_columns = chunk.shape[1]
+        finally:
+            if writer is not None:
+                writer.close()
+
+    timed_result = TimedResult(
+        'convert_csv_to_parquet',
+        'fileio',
+        (rows, n_columns),
+        largest_chunk.sum(),
+        largest_chunk,
+        c.elapsed_time,
+        os.path.getsize(csv_path),
+        cpu_time=c.cpu_time,
+        peak_rss_delta=c.peak_rss_delta,
+        gc_collections=c.gc_collections,
+        tags={'engine': engine, 'chunksize': chunksize, 'memory_limit': memory_limit}
+    )
+    if store is not None:
+        store.add(timed_result)
+    elif db_path:
+        timed_result.save_to_db(db_path)
+
+    return timed_result
+
+
+def _read_arrow_table(file_path: str, columns: Optional[List[str]] = None):
+    """Reads a parquet, feather or (optionally gzipped) csv file into an Arrow table."""
+    if file_path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.read_table(file_path, columns=columns)
+    if file_path.endswith(('.feather', '.arrow')):
+        import pyarrow.feather as feather
+        return feather.read_table(file_path, columns=columns)
+    if file_path.endswith(('.csv', '.csv.gz')):
+        import pyarrow.csv as pv
+        # The compression is detected from the file extension.
+        convert_options = pv.ConvertOptions(include_columns=columns) if columns else None
+        return pv.read_csv(file_path, convert_options=convert_options)
+    raise ValueError(f"Unsupported file format: {file_path}")
+
+
+def _timed_read(file_path: str, columns: Optional[List[str]]) -> Tuple[object, float]:
+    start_time = perf_counter()
+    table = _read_arrow_table(file_path, columns)
+    return table, perf_counter() - start_time
+
+
+async def read_tables_async(paths: Sequence[str], max_in_flight: int = 8,
+                            columns: Optional[List[str]] = None) -> List[Tuple[object, float]]:
+    """
+    Reads files into Arrow tables from an event loop, with at most max_in_flight reads at a time.
+
+    Every read runs in a worker thread, where pyarrow releases the GIL while it decodes.
+
+    Returns:
+        list of tuple: (table, seconds) per file, in the order of paths.
+    """
+    semaphore = asyncio.Semaphore(max_in_flight)
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        async def read(file_path: str):
+            async with semaphore:
+                return await loop.run_in_executor(executor, _timed_read, file_path, columns)
+        return await asyncio.gather(*(read(file_path) for file_path in paths))
+
+
+def read_files(paths: Union[str, Sequence[str]], mode: str = 'threads', workers: int = 8,
+               columns: Optional[List[str]] = None, repeat: int = 1, db_path: Optional[str] = None,
+               store: Optional[ResultStore] = None, tags: Optional[dict] = None) -> Tuple[pd.DataFrame, TimedResult]:
+    """
+    Reads many parquet, feather or csv partitions into one DataFrame and times it.
+
+    The files are read into Arrow tables, concatenated without copying and converted to pandas once, so
+    the columns of the result are allocated a single time instead of once per file and again by pd.concat.
+    The files must share a schema.
+
+    Args:
+        paths (str or list of str): A glob pattern, e.g. 'data/part-*.parquet', or a list of paths.
+        mode (str, optional): 'sequential', 'threads' (a pool of workers threads) or 'asyncio'
+            (read_tables_async with workers reads in flight). Use read_tables_async directly inside a
+            running event loop, e.g. in a notebook.
+        workers (int, optional): Number of concurrent reads.
+        columns (list of str, optional): Only read these columns.
+        repeat (int, optional): Number of timed reads of all the files. The elapsed time is their median.
+        db_path (str, optional): Path to a SQLite database where the timing information should be saved.
+        store (ResultStore, optional): Store to save the timing information to instead of db_path.
+        tags (dict, optional): Extra labels for the result. The mode, workers and number of files are added.
+
+    Returns:
+        tuple: The DataFrame (of the last read) and a TimedResult named read_files. Its samples are the
+            wall times of the whole reads, so rows_per_second and mb_per_second give the aggregate
+            throughput, and its latencies are the read times of every file in every run.
+    """
+    import pyarrow as pa
+
+    paths = sorted(glob.glob(paths)) if isinstance(paths, str) else list(paths)
+    if not paths:
+        raise ValueError("No files to read")
+    if mode not in ('sequential', 'threads', 'asyncio'):
+        raise ValueError(f"Unsupported mode: {mode}")
+    if repeat < 1:
+        raise ValueError(f"repeat must be at least 1, got {repeat}")
+
+    contexts, latencies = [], []
+    for _ in range(repeat):
+        with TimedContext(None) as c:
+            if mode == 'sequential':
+                reads = [_timed_read(file_path, columns) for file_path in paths]
+            elif mode == 'threads':
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    reads = list(executor.map(_timed_read, paths, [columns] * len(paths)))
+            else:
+                reads = asyncio.run(read_tables_async(paths, max_in_flight=workers, columns=columns))
+            df = pa.concat_tables([table for table, _ in reads]).to_pandas()
+        contexts.append(c)
+        latencies.extend(seconds for _, seconds in reads)
+
+    memory_usage_detail = _memory_profile(df)
+    timed_result = TimedResult(
+        'read_files',
+        'fileio',
+        df.shape,
+        int(memory_usage_detail[0].sum()),
+        memory_usage_detail,
+        statistics.median(c.elapsed_time for c in contexts),
+        sum(os.path.getsize(file_path) for file_path in paths),
+        cpu_time=statistics.median(c.cpu_time for c in contexts),
+        peak_rss_delta=_max_or_none(c.peak_rss_delta for c in contexts),
+        gc_collections=sum(c.gc_collections for c in contexts),
+        samples=[c.elapsed_time for c in contexts],
+        tags={'mode': mode, 'workers': 1 if mode == 'sequential' else workers, 'n_files': len(paths), **(tags or {})},
+        latencies=latencies
+    )
+    if store is not None:
+        store.add(timed_result)
+    elif db_path:
+        timed_result.save_to_db(db_path)
+
+    return df, timed_result
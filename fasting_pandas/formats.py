@@ -0,0 +1,158 @@
+from importlib.util import find_spec
+from typing import Callable, Dict, List, Optional, Sequence
+import pandas as pd
+import numpy as np
+
+# The columns read by the column-projected variants, as in Lesson 2.
+PROJECTED_COLUMNS = ['size', 'age', 'date']
+
+
+def _upcast_float16(df: pd.DataFrame) -> pd.DataFrame:
+    """Returns df with float16 columns as float32, for formats that cannot store half floats."""
+    float16_columns = [column for column, dtype in df.dtypes.items() if dtype == np.float16]
+    if not float16_columns:
+        return df
+    return df.astype({column: 'float32' for column in float16_columns})
+
+
+def _to_csv(df: pd.DataFrame, file_path: str, **options) -> None:
+    df.to_csv(file_path, index=False, **options)
+
+
+def _to_json(df: pd.DataFrame, file_path: str, **options) -> None:
+    df.to_json(file_path, **options)
+
+
+def _to_pickle(df: pd.DataFrame, file_path: str, **options) -> None:
+    pd.DataFrame.to_pickle(df, file_path, **options)
+
+
+def _to_parquet(df: pd.DataFrame, file_path: str, **options) -> None:
+    _upcast_float16(df).to_parquet(file_path, index=False, **options)
+
+
+def _to_feather(df: pd.DataFrame, file_path: str, **options) -> None:
+    df.reset_index(drop=True).to_feather(file_path, **options)
+
+
+def write_arrow_ipc_single_batch(df: pd.DataFrame, file_path: str) -> None:
+    """Writes an uncompressed Feather (Arrow IPC) file holding a single record batch.
+
+    pandas writes 64K-row batches by default, which read_arrow_ipc_memory_mapped would have to
+    concatenate, copying every column out of the map.
+    """
+    df.reset_index(drop=True).to_feather(file_path, compression='uncompressed', chunksize=max(len(df), 1))
+
+
+def _to_hdf(df: pd.DataFrame, file_path: str, **options) -> None:
+    _upcast_float16(df).to_hdf(file_path, key='data', mode='w', **options)
+
+
+def _read_hdf(file_path: str, **options) -> pd.DataFrame:
+    return pd.read_hdf(file_path, key='data', **options)
+
+
+def read_arrow_ipc_memory_mapped(file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Reads an uncompressed Feather (Arrow IPC) file through a memory map.
+
+    Numeric columns without nulls are handed to pandas without copying them out of the mapped file.
+    """
+    import pyarrow as pa
+    source = pa.memory_map(file_path, 'r')
+    try:
+        table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        return table.to_pandas(split_blocks=True)
+    finally:
+        source.close()
+
+
+class FileFormat:
+    """
+    A writer/reader pair for one benchmarked file format variant, e.g. parquet with zstd compression.
+
+    The writer is called as writer(df, file_path, **write_options) and the reader as
+    reader(file_path, **read_options).
+    """
+
+    def __init__(self, name: str, extension: str, writer: Callable, reader: Callable,
+                 write_options: Optional[dict] = None, read_options: Optional[dict] = None,
+                 requires: Sequence[str] = ()):
+        """
+        Args:
+            name (str): The unique name of the variant. Used in method names, e.g. to_parquet-zstd.
+            extension (str): The file extension, without the leading dot.
+            writer (callable): Writes a DataFrame to a path.
+            reader (callable): Reads a path into a DataFrame.
+            write_options (dict, optional): Keyword arguments for the writer.
+            read_options (dict, optional): Keyword arguments for the reader.
+            requires (list of str, optional): Modules the variant needs that may not be installed.
+        """
+        self.name = name
+        self.extension = extension
+        self.writer = writer
+        self.reader = reader
+        self.write_options = write_options or {}
+        self.read_options = read_options or {}
+        self.requires = tuple(requires)
+
+    @property
+    def available(self) -> bool:
+        """Whether the modules this variant requires are installed."""
+        return all(find_spec(module) is not None for module in self.requires)
+
+    def write(self, df: pd.DataFrame, file_path: str) -> None:
+        self.writer(df, file_path, **self.write_options)
+
+    def read(self, file_path: str) -> pd.DataFrame:
+        return self.reader(file_path, **self.read_options)
+
+    def __repr__(self):
+        return f"FileFormat({self.name!r})"
+
+
+FORMATS: Dict[str, FileFormat] = {}
+
+
+def register_format(file_format: FileFormat) -> FileFormat:
+    """Adds a file format variant to the registry, replacing any variant with the same name."""
+    FORMATS[file_format.name] = file_format
+    return file_format
+
+
+def get_format(name: str) -> FileFormat:
+    """Returns the registered file format variant with the given name."""
+    try:
+        return FORMATS[name]
+    except KeyError:
+        raise ValueError(f"Unsupported file format: {name}") from None
+
+
+register_format(FileFormat('csv', 'csv', _to_csv, pd.read_csv))
+register_format(FileFormat('csv-gzip', 'csv.gz', _to_csv, pd.read_csv,
+                           {'compression': 'gzip'}, {'compression': 'gzip'}))
+register_format(FileFormat('csv-usecols', 'csv', _to_csv, pd.read_csv,
+                           read_options={'usecols': PROJECTED_COLUMNS}))
+register_format(FileFormat('json', 'json', _to_json, pd.read_json))
+register_format(FileFormat('pickle', 'pickle', _to_pickle, pd.read_pickle))
+register_format(FileFormat('pickle-gzip', 'pickle.gz', _to_pickle, pd.read_pickle,
+                           {'compression': 'gzip'}, {'compression': 'gzip'}))
+register_format(FileFormat('parquet', 'parquet', _to_parquet, pd.read_parquet,
+                           {'compression': 'snappy'}, requires=['pyarrow']))
+register_format(FileFormat('parquet-zstd', 'parquet', _to_parquet, pd.read_parquet,
+                           {'compression': 'zstd'}, requires=['pyarrow']))
+register_format(FileFormat('parquet-uncompressed', 'parquet', _to_parquet, pd.read_parquet,
+                           {'compression': None}, requires=['pyarrow']))
+register_format(FileFormat('parquet-rg100k', 'parquet', _to_parquet, pd.read_parquet,
+                           {'compression': 'snappy', 'row_group_size': 100_000}, requires=['pyarrow']))
+register_format(FileFormat('parquet-columns', 'parquet', _to_parquet, pd.read_parquet,
+                           {'compression': 'snappy'}, {'columns': PROJECTED_COLUMNS}, requires=['pyarrow']))
+register_format(FileFormat('feather', 'feather', _to_feather, pd.read_feather, requires=['pyarrow']))
+register_format(FileFormat('feather-uncompressed', 'feather', _to_feather, pd.read_feather,
+                           {'compression': 'uncompressed'}, requires=['pyarrow']))
+register_format(FileFormat('feather-mmap', 'feather', write_arrow_ipc_single_batch, read_arrow_ipc_memory_mapped,
+                           requires=['pyarrow']))
+register_format(FileFormat('feather-columns', 'feather', _to_feather, pd.read_feather,
+                           read_options={'columns': PROJECTED_COLUMNS}, requires=['pyarrow']))
+register_format(FileFormat('hdf5', 'h5', _to_hdf, _read_hdf, requires=['tables']))
@@ -0,0 +1,201 @@
+import cProfile
+import marshal
+import os
+import pstats
+import sys
+import threading
+from collections import Counter
+from time import perf_counter
+from typing import List, Optional
+
+PROFILE_MODES = ('cprofile', 'sampling')
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+def _frame_stack(frame) -> List[str]:
+    """Returns the labels of frame and its callers, outermost first."""
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class _StackSampler(threading.Thread):
+    """Samples the stack of one thread every interval seconds into a Counter of collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval: float, base_depth: int, stacks: Counter):
+        super().__init__(name='fasting_pandas-stack-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.base_depth = base_depth
+        self.stacks = stacks
+        self.stopped = threading.Event()
+
+    def run(self):
+        last_sample = perf_counter()
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            now = perf_counter()
+            # C code holding the GIL (e.g. a JSON encoder) delays the sampler, so a late sample counts
+            # for every interval that passed since the previous one.
+            ticks = max(1, round((now - last_sample) / self.interval))
+            last_sample = now
+            if frame is not None:
+                # Frames outside the profiled block are the same for every sample, so they are dropped.
+                self.stacks[';'.join(_frame_stack(frame)[self.base_depth:])] += ticks
+
+
+class CallProfile:
+    """
+    Profile of the calls made while it is active, by cProfile or by a sampling profiler.
+
+    cProfile sees every function call but adds overhead to each of them, which inflates code that makes
+    many small Python calls. The sampling profiler records the stack of the profiled thread every
+    interval seconds instead; its overhead does not depend on the code, and its samples can be
+    written as collapsed stacks for flamegraph tools. A profile can be started and stopped several
+    times, e.g. around every run of a repeated benchmark, and accumulates.
+
+    Example:
+        with CallProfile() as profile:
+            df.to_json(path)
+        profile.top_functions(10)
+    """
+
+    def __init__(self, mode: str = 'cprofile', interval: float = 0.001):
+        """
+        Args:
+            mode (str, optional): 'cprofile' or 'sampling'.
+            interval (float, optional): Seconds between samples in sampling mode.
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unsupported profile mode: {mode}")
+        self.mode = mode
+        self.interval = interval
+        self.stats = {}
+        self.stacks = Counter()
+        self._profiler = None
+        self._sampler = None
+
+    def start(self) -> None:
+        if self.mode == 'cprofile':
+            if self._profiler is None:
+                self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            caller = sys._getframe(1)
+            if caller.f_code is CallProfile.__enter__.__code__:
+                caller = caller.f_back
+            # Samples start below the function that started the profile.
+            base_depth = len(_frame_stack(caller))
+            self._sampler = _StackSampler(threading.get_ident(), self.interval, base_depth, self.stacks)
+            self._sampler.start()
+
+    def stop(self) -> None:
+        if self.mode == 'cprofile':
+            self._profiler.disable()
+            self._profiler.create_stats()
+            self.stats = dict(self._profiler.stats)
+        else:
+            self._sampler.stopped.set()
+            self._sampler.join()
+            self._sampler = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def top_functions(self, n: int = 20) -> List[dict]:
+        """
+        Returns the n functions with the most time spent in their own code.
+
+        Returns:
+            list of dict: function, calls (None when sampled), self_seconds and cumulative_seconds.
+                Sampled times are the number of samples times the interval.
+        """
+        if self.mode == 'cprofile':
+            functions = [{'function': f'{name} ({os.path.basename(file_name)}:{line})' if line else name,
+                          'calls': calls,
+                          'self_seconds': self_time,
+                          'cumulative_seconds': cumulative_time}
+                         for (file_name, line, name), (_, calls, self_time, cumulative_time, _)
+                         in self.stats.items()]
+        else:
+            own, total = Counter(), Counter()
+            for stack, count in self.stacks.items():
+                frames = stack.split(';')
+                own[frames[-1]] += count
+                for frame in set(frames):
+                    total[frame] += count
+            functions = [{'function': function,
+                          'calls': None,
+                          'self_seconds': own[function] * self.interval,
+                          'cumulative_seconds': samples * self.interval}
+                         for function, samples in total.items()]
+
+        functions.sort(key=lambda function: (function['self_seconds'], function['cumulative_seconds']), reverse=True)
+        return functions[:n]
+
+    def print_top_functions(self, n: int = 20) -> None:
+        print(f"--- Top {n} functions by self time ({self.mode}) ---")
+        for function in self.top_functions(n):
+            calls = '' if function['calls'] is None else f"{function['calls']:>10} calls"
+            print(f"{function['self_seconds']:10.5f}s self {function['cumulative_seconds']:10.5f}s cumulative "
+                  f"{calls}  {function['function']}")
+
+    def dump_stats(self, file_path: str) -> None:
+        """Writes the cProfile stats in the pstats format, readable by pstats.Stats, snakeviz or gprof2dot."""
+        if self.mode != 'cprofile':
+            raise ValueError("Only cProfile stats can be dumped, use dump_collapsed_stacks for sampled profiles")
+        with open(file_path, 'wb') as f:
+            marshal.dump(self.stats, f)
+
+    def dump_collapsed_stacks(self, file_path: str) -> None:
+        """Writes the sampled stacks as 'frame;frame;frame count' lines, the input of flamegraph.pl and speedscope."""
+        if self.mode != 'sampling':
+            raise ValueError("Collapsed stacks need profile='sampling'")
+        with open(file_path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+
+    def pstats(self) -> pstats.Stats:
+        """Returns the cProfile stats as a pstats.Stats object, e.g. to call print_callers on it."""
+        stats = pstats.Stats()
+        stats.stats = self.stats
+        stats.get_top_level_stats()
+        return stats
+
+    def to_bytes(self) -> bytes:
+        """Serializes the profile with marshal, the format of pstats files, to store it in the results table."""
+        return marshal.dumps({'mode': self.mode, 'interval': self.interval,
+                              'stats': self.stats, 'stacks': dict(self.stacks)})
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'CallProfile':
+        state = marshal.loads(data)
+        profile = cls(state['mode'], state['interval'])
+        profile.stats = state['stats']
+        profile.stacks = Counter(state['stacks'])
+        return profile
+
+    def __repr__(self):
+        return f"CallProfile({self.mode!r}, functions={len(self.stats) if self.mode == 'cprofile' else len(self.stacks)})"
+
+
+def resolve_profile_mode(profile) -> Optional[str]:
+    """Maps the profile argument of time() and timeit (False, True or a mode) to a mode, or None."""
+    if not profile:
+        return None
+    if profile is True:
+        return 'cprofile'
+    if profile not in PROFILE_MODES:
+        raise ValueError(f"Unsupported profile mode: {profile}")
+    return profile
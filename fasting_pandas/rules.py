@@ -0,0 +1,167 @@
+import re
+from typing import Any, Callable, List, Optional, Tuple, Union
+import pandas as pd
+import numpy as np
+
+Condition = Union[str, Callable[[pd.DataFrame], Any]]
+Rule = Tuple[Condition, Any]
+
+_IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+
+class RuleSet:
+    """
+    Vectorized replacement for row-wise if/elif/else functions such as calculate_my_reward.
+
+    Each rule is a (condition, value) pair and the first rule whose condition holds gives the value
+    of a row, like np.select. Conditions are pd.eval expressions over column names
+    (e.g. 'study_time >= 4 & test_1_score >= 0.9') or callables that take a DataFrame and return
+    a boolean array. Values are column names or literals. Once most rows of a chunk are matched, later
+    conditions are only evaluated on the rows that no earlier rule matched.
+
+    Example:
+        rules = RuleSet([('study_time >= 4 & test_1_score >= 0.9', 'happy_food'),
+                         ('test_1_score >= 0.65 & age <= 13', 'happy_food')],
+                        default='sad_food')
+        df['my_reward'] = rules.evaluate(df)
+    """
+
+    def __init__(self, rules: List[Rule], default: Any = None, engine: Optional[str] = None):
+        """
+        Args:
+            rules (list of tuple): (condition, value) pairs, in order of priority.
+            default: Value, or column name, for rows that match no rule.
+            engine (str, optional): pd.eval engine for string conditions. Defaults to numexpr when installed.
+        """
+        self.rules = list(rules)
+        self.default = default
+        self.engine = engine
+
+    @staticmethod
+    def _is_column(df: pd.DataFrame, value: Any) -> bool:
+        return isinstance(value, str) and value in df.columns
+
+    def _condition_columns(self, df: pd.DataFrame) -> List[Optional[List[str]]]:
+        """Returns the columns each string condition refers to."""
+        return [None if callable(condition) else
+                [name for name in dict.fromkeys(_IDENTIFIER.findall(condition)) if name in df.columns]
+                for condition, _ in self.rules]
+
+    def _evaluate_condition(self, condition: Condition, columns: Optional[List[str]],
+                            df: pd.DataFrame, arrays: dict, rows: Union[slice, np.ndarray], n_rows: int) -> np.ndarray:
+        """Evaluates a condition on the rows at the given positions, a slice or an array of positions."""
+        if callable(condition):
+            result = condition(df.iloc[rows])
+        else:
+            namespace = {name: arrays[name][rows] for name in columns}
+            result = pd.eval(condition, local_dict=namespace, engine=self.engine)
+        result = np.asarray(result, dtype=bool)
+        if result.ndim == 0:
+            result = np.full(n_rows, bool(result))
+        return result
+
+    def _categorical_plan(self, df: pd.DataFrame, values: List[Any]) -> Optional[Tuple[list, list]]:
+        """
+        Returns the union categories and the per-value codes when the output can stay categorical:
+        every column value is categorical and every literal is a string.
+        """
+        columns = [value for value in values if self._is_column(df, value)]
+        literals = [value for value in values if not self._is_column(df, value)]
+        if not all(isinstance(df[column].dtype, pd.CategoricalDtype) for column in columns):
+            return None
+        if not all(isinstance(literal, str) for literal in literals):
+            return None
+        if not columns and not literals:
+            return None
+
+        categories = {}
+        for value in values:
+            if self._is_column(df, value):
+                for category in df[value].cat.categories:
+                    categories.setdefault(category, len(categories))
+            else:
+                categories.setdefault(value, len(categories))
+        code_dtype = np.int8 if len(categories) < 127 else np.int16 if len(categories) < 32_767 else np.int32
+
+        recoded = {}
+        for value in values:
+            if self._is_column(df, value) and value not in recoded:
+                column = df[value].cat
+                # The extra -1 keeps missing values (code -1) missing after the recoding.
+                recode = np.array([categories[category] for category in column.categories] + [-1], dtype=code_dtype)
+                recoded[value] = recode[column.codes.to_numpy()]
+        sources = [recoded[value] if self._is_column(df, value) else code_dtype(categories[value])
+                   for value in values]
+
+        return list(categories), sources
+
+    def _value_plan(self, df: pd.DataFrame, values: List[Any]) -> Tuple[np.dtype, list]:
+        arrays = {value: df[value].to_numpy() for value in values if self._is_column(df, value)}
+        sources = [arrays[value] if self._is_column(df, value) else value for value in values]
+        try:
+            dtype = np.result_type(*[source.dtype if isinstance(source, np.ndarray) else np.asarray(source)
+                                     for source in sources])
+        except TypeError:
+            dtype = np.dtype(object)
+        if dtype.kind in 'USV':
+            dtype = np.dtype(object)
+        return dtype, sources
+
+    def evaluate(self, df: pd.DataFrame, chunk_rows: Optional[int] = None) -> pd.Series:
+        """
+        Evaluates the rules for every row of df.
+
+        Args:
+            df (pd.DataFrame): The DataFrame to evaluate.
+            chunk_rows (int, optional): Evaluate this many rows at a time to bound the size of the
+                temporary condition arrays. Evaluates all rows at once by default.
+
+        Returns:
+            pd.Series: The selected values, aligned with df. The result is categorical when all the
+                values are categorical columns or string literals.
+        """
+        values = [value for _, value in self.rules] + [self.default]
+        condition_columns = self._condition_columns(df)
+        arrays = {name: df[name].to_numpy()
+                  for columns in condition_columns if columns for name in columns}
+
+        plan = self._categorical_plan(df, values)
+        if plan is not None:
+            categories, sources = plan
+            output = np.empty(len(df), dtype=sources[-1].dtype)
+        else:
+            dtype, sources = self._value_plan(df, values)
+            output = np.empty(len(df), dtype=dtype)
+
+        chunk_rows = chunk_rows or max(len(df), 1)
+        for start in range(0, len(df), chunk_rows):
+            stop = min(start + chunk_rows, len(df))
+            chunk = output[start:stop]
+            unassigned = np.ones(stop - start, dtype=bool)
+            for (condition, _), columns, source in zip(self.rules, condition_columns, sources):
+                n_unassigned = np.count_nonzero(unassigned)
+                if not n_unassigned:
+                    break
+                if n_unassigned < len(unassigned) // 2:
+                    # Most rows are assigned: gather the rest instead of evaluating the condition on every row.
+                    positions = np.flatnonzero(unassigned)
+                    matched = np.zeros(len(unassigned), dtype=bool)
+                    matched[positions] = self._evaluate_condition(condition, columns, df, arrays,
+                                                                  positions + start, len(positions))
+                else:
+                    matched = self._evaluate_condition(condition, columns, df, arrays, slice(start, stop),
+                                                       len(unassigned)) & unassigned
+                np.copyto(chunk, source[start:stop] if isinstance(source, np.ndarray) else source, where=matched)
+                unassigned &= ~matched
+            default = sources[-1]
+            np.copyto(chunk, default[start:stop] if isinstance(default, np.ndarray) else default, where=unassigned)
+
+        if plan is not None:
+            return pd.Series(pd.Categorical.from_codes(output, categories=categories), index=df.index)
+        return pd.Series(output, index=df.index)
+
+
+def select_rules(df: pd.DataFrame, rules: List[Rule], default: Any = None,
+                 chunk_rows: Optional[int] = None, engine: Optional[str] = None) -> pd.Series:
+    """Evaluates (condition, value) rules over df; the first rule that holds gives a row its value. See RuleSet."""
+    return RuleSet(rules, default, engine=engine).evaluate(df, chunk_rows=chunk_rows)
@@ -0,0 +1,311 @@
+"""
+Benchmark runs and regression reports.
+
+Every run records when it started and the environment it ran in, and the results saved by a
+ResultStore with that run_id point back to it. compare() then checks two runs against each other,
+e.g. before and after a pandas upgrade:
+
+    python -m fasting_pandas data/benchmarks.db list
+    python -m fasting_pandas data/benchmarks.db compare <run_a> <run_b> --threshold 0.1
+
+compare exits with status 1 when it finds a regression, and with status 2 when the runs cannot be
+compared, e.g. because a run_id has no results.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import uuid
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+
+from .core import RUN_COLUMNS, ResultStore
+
+# Results are compared per method, size and full set of tags (file format, dtypes, reader mode, workers,
+# scaling point, ...), so differently configured timings are never pooled into one cell.
+REPORT_KEY = ['method_name', 'n_rows', 'tags']
+
+
+def _package_version(name: str) -> Optional[str]:
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+def _git(*args: str) -> Optional[str]:
+    """Runs a git command in the directory of this package and returns its output, or None if it fails."""
+    try:
+        output = subprocess.run(['git', *args], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, timeout=10, check=True).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.strip()
+
+
+def collect_environment() -> dict:
+    """Returns the git commit, library versions and host the benchmarks run on."""
+    git_status = _git('status', '--porcelain', '--untracked-files=no')
+    return {
+        'git_sha': _git('rev-parse', 'HEAD'),
+        'git_dirty': None if git_status is None else int(bool(git_status)),
+        'python_version': platform.python_version(),
+        'pandas_version': _package_version('pandas'),
+        'numpy_version': _package_version('numpy'),
+        'pyarrow_version': _package_version('pyarrow'),
+        'hostname': platform.node(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def start_run(db_path: str, label: Optional[str] = None, run_id: Optional[str] = None,
+              kind: Optional[str] = None) -> str:
+    """
+    Records a new run and its environment in the runs table.
+
+    Args:
+        db_path (str): Path to the SQLite database.
+        label (str, optional): A free-form description, e.g. 'pandas 2.2 upgrade'.
+        run_id (str, optional): The id of the run. A random one is generated by default.
+        kind (str, optional): The benchmark that produced the run, e.g. 'matrix' or 'scaling', so it can be
+            found again by latest_run.
+
+    Returns:
+        str: The run_id to pass to ResultStore.
+    """
+    run = {'run_id': run_id or uuid.uuid4().hex[:12],
+           'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+           'label': label,
+           'kind': kind,
+           **collect_environment()}
+    names = [name for name, _ in RUN_COLUMNS]
+    with ResultStore(db_path) as store:
+        with store.connection as conn:
+            conn.execute(f"INSERT INTO runs ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                         [run[name] for name in names])
+
+    return run['run_id']
+
+
+def list_runs(db_path: str) -> pd.DataFrame:
+    """Returns every recorded run, oldest first, with the number of results saved under it."""
+    with ResultStore(db_path) as store:
+        return pd.read_sql_query("""
+            SELECT runs.*, COUNT(results.run_id) AS n_results
+            FROM runs LEFT JOIN results ON results.run_id = runs.run_id
+            GROUP BY runs.run_id
+            ORDER BY runs.started_at, runs.rowid
+        """, store.connection)
+
+
+def latest_run(db_path: str, kind: Optional[str] = None) -> Optional[str]:
+    """Returns the run_id of the most recently started run, only counting runs of the given kind, or None."""
+    runs = list_runs(db_path)
+    if kind is not None:
+        runs = runs[runs['kind'] == kind]
+    return runs['run_id'].iloc[-1] if len(runs) else None
+
+
+def _result_key(result) -> tuple:
+    return result.method_name, result.shape[0], json.dumps(result.tags, sort_keys=True)
+
+
+def _collect_run(store: ResultStore, run_id: str) -> Dict[tuple, dict]:
+    """Pools the timing samples and memory figures of a run per REPORT_KEY."""
+    cells = {}
+    for result in store.iter_results(run_id=run_id):
+        cell = cells.setdefault(_result_key(result), {'samples': [], 'memory_usage': [], 'peak_rss_delta': []})
+        cell['samples'].extend(result.samples)
+        cell['memory_usage'].append(result.memory_usage)
+        if result.peak_rss_delta is not None:
+            cell['peak_rss_delta'].append(result.peak_rss_delta)
+    if not cells:
+        raise ValueError(f"No results saved under run {run_id!r}")
+    return cells
+
+
+def _mean_and_variance(values: List[float]) -> Tuple[float, float]:
+    mean = sum(values) / len(values)
+    variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1) if len(values) > 1 else 0.0
+    return mean, variance
+
+
+def _betacf(a: float, b: float, x: float) -> float:
+    """Continued fraction of the regularized incomplete beta function (modified Lentz's method)."""
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1.0)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    fraction = d
+    for m in range(1, 300):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            fraction *= c * d
+        if abs(c * d - 1.0) < 1e-12:
+            break
+    return fraction
+
+
+def _betainc(a: float, b: float, x: float) -> float:
+    """The regularized incomplete beta function I_x(a, b)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def welch_test(samples_a: List[float], samples_b: List[float]) -> Tuple[Optional[float], Optional[float]]:
+    """
+    One-sided Welch's t-test of whether samples_b has a larger mean than samples_a.
+
+    Returns:
+        tuple: The t statistic and its p-value, or (None, None) when either side has fewer than two samples.
+    """
+    if len(samples_a) < 2 or len(samples_b) < 2:
+        return None, None
+    mean_a, variance_a = _mean_and_variance(samples_a)
+    mean_b, variance_b = _mean_and_variance(samples_b)
+    error_a, error_b = variance_a / len(samples_a), variance_b / len(samples_b)
+    if error_a + error_b == 0:
+        return None, 0.0 if mean_b > mean_a else 1.0
+    t = (mean_b - mean_a) / math.sqrt(error_a + error_b)
+    degrees = (error_a + error_b) ** 2 / (error_a ** 2 / (len(samples_a) - 1) + error_b ** 2 / (len(samples_b) - 1))
+    tail = 0.5 * _betainc(degrees / 2, 0.5, degrees / (degrees + t * t))
+    return t, tail if t > 0 else 1.0 - tail
+
+
+def _relative_change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    if before is None or after is None or before == 0:
+        return None
+    return after / before - 1
+
+
+def _grew(before: Optional[float], after: Optional[float], threshold: float, floor: int) -> bool:
+    change = _relative_change(before, after)
+    return change is not None and change > threshold and after - before > floor
+
+
+def compare(db_path: str, run_a: str, run_b: str, threshold: float = 0.05, alpha: float = 0.05,
+            memory_threshold: Optional[float] = None, memory_floor: int = 1 << 20) -> pd.DataFrame:
+    """
+    Compares the results of two runs per (method, size, tags) cell.
+
+    A cell is a slowdown when its mean time in run_b is more than threshold above run_a and a one-sided
+    Welch's t-test over the timing samples gives a p-value below alpha. Cells with a single sample on
+    either side cannot be tested and are judged on the threshold alone; the tested column tells them
+    apart, so use repeat > 1 for reliable reports.
+
+    A cell has memory growth when its DataFrame memory usage or its peak RSS delta grew by more than
+    memory_threshold and by more than memory_floor bytes, which keeps allocator noise on small datasets
+    out of the report.
+
+    Args:
+        db_path (str): Path to the SQLite database.
+        run_a (str): The baseline run.
+        run_b (str): The run to check.
+        threshold (float, optional): Relative slowdown to report, e.g. 0.05 for 5%.
+        alpha (float, optional): Significance level of the t-test.
+        memory_threshold (float, optional): Relative memory growth to report. Defaults to threshold.
+        memory_floor (int, optional): Smallest memory growth to report, in bytes.
+
+    Returns:
+        pd.DataFrame: One row per cell present in both runs, with the number of samples and mean times,
+            the relative changes, the t statistic and p-value, whether the t-test could run, and the
+            slowdown, memory_growth and regression flags. tags is the JSON of the cell's tags.
+
+    Raises:
+        ValueError: If either run has no results.
+    """
+    if memory_threshold is None:
+        memory_threshold = threshold
+    with ResultStore(db_path) as store:
+        cells_a = _collect_run(store, run_a)
+        cells_b = _collect_run(store, run_b)
+
+    rows = []
+    for key in cells_a.keys() & cells_b.keys():
+        a, b = cells_a[key], cells_b[key]
+        time_a, _ = _mean_and_variance(a['samples'])
+        time_b, _ = _mean_and_variance(b['samples'])
+        t, p_value = welch_test(a['samples'], b['samples'])
+        time_change = _relative_change(time_a, time_b)
+        memory_a, memory_b = max(a['memory_usage']), max(b['memory_usage'])
+        rss_a, rss_b = max(a['peak_rss_delta'], default=None), max(b['peak_rss_delta'], default=None)
+        slowdown = time_change is not None and time_change > threshold and (p_value is None or p_value < alpha)
+        memory_growth = (_grew(memory_a, memory_b, memory_threshold, memory_floor) or
+                         _grew(rss_a, rss_b, memory_threshold, memory_floor))
+        rows.append({**dict(zip(REPORT_KEY, key)),
+                     'n_samples_a': len(a['samples']), 'n_samples_b': len(b['samples']),
+                     'time_a': time_a, 'time_b': time_b, 'time_change': time_change,
+                     't_statistic': t, 'p_value': p_value, 'tested': p_value is not None,
+                     'memory_change': _relative_change(memory_a, memory_b),
+                     'peak_rss_change': _relative_change(rss_a, rss_b),
+                     'slowdown': slowdown, 'memory_growth': memory_growth,
+                     'regression': slowdown or memory_growth})
+
+    report = pd.DataFrame(rows, columns=REPORT_KEY + [
+        'n_samples_a', 'n_samples_b', 'time_a', 'time_b', 'time_change', 't_statistic', 'p_value', 'tested',
+        'memory_change', 'peak_rss_change', 'slowdown', 'memory_growth', 'regression'])
+    return report.sort_values(REPORT_KEY).reset_index(drop=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m fasting_pandas', description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('db_path', help='SQLite database written by ResultStore')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='list the recorded runs')
+    compare_parser = commands.add_parser('compare', help='compare two runs and exit with 1 on a regression, '
+                                                         'or 2 if they cannot be compared')
+    compare_parser.add_argument('run_a', help="baseline run_id, or 'previous' for the second latest run")
+    compare_parser.add_argument('run_b', nargs='?', default='latest', help="run_id to check, 'latest' by default")
+    compare_parser.add_argument('--threshold', type=float, default=0.05, help='relative slowdown to report')
+    compare_parser.add_argument('--alpha', type=float, default=0.05, help='significance level of the t-test')
+    compare_parser.add_argument('--memory-threshold', type=float, default=None,
+                                help='relative memory growth to report, defaults to --threshold')
+    compare_parser.add_argument('--memory-floor', type=int, default=1 << 20,
+                                help='smallest memory growth to report, in bytes')
+    args = parser.parse_args(argv)
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.max_rows', None):
+        if args.command == 'list':
+            print(list_runs(args.db_path).to_string(index=False))
+            return 0
+
+        run_ids = list(list_runs(args.db_path)['run_id'])
+        aliases = {'latest': run_ids[-1] if run_ids else None,
+                   'previous': run_ids[-2] if len(run_ids) > 1 else None}
+        run_a, run_b = (aliases.get(run, run) for run in (args.run_a, args.run_b))
+        if run_a is None or run_b is None:
+            print(f"Not enough runs in {args.db_path} to compare {args.run_a} with {args.run_b}", file=sys.stderr)
+            return 2
+        try:
+            report = compare(args.db_path, run_a, run_b, threshold=args.threshold, alpha=args.alpha,
+                             memory_threshold=args.memory_threshold, memory_floor=args.memory_floor)
+        except ValueError as e:
+            print(f"Cannot compare run {run_a} with run {run_b}: {e}", file=sys.stderr)
+            return 2
+        print(f"Comparing run {run_a} (baseline) with run {run_b}")
+        print(report.to_string(index=False))
+        regressions = int(report['regression'].sum())
+        print(f"{regressions} regression(s) in {len(report)} compared cells")
+        untested = len(report) - int(report['tested'].sum())
+        if untested:
+            print(f"{untested} cell(s) have fewer than two timing samples in a run, so no t-test was possible "
+                  f"and their slowdowns are judged on --threshold alone. Benchmark with repeat >= 2 for "
+                  f"significance tests.")
+
+    return 1 if regressions else 0
+
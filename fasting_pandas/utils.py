@@ -1,6 +1,9 @@
 from functools import wraps
 from time import perf_counter
-from typing import Tuple, Any
+from typing import Tuple, Any, Dict, List, Union
+import math
+import os
+import statistics
 import pandas as pd
 
 
@@ -20,32 +23,104 @@ def calculate_percentage_difference(before: pd.Series, after: pd.Series) -> pd.S
     return (after - before) / before * 100
 
 
-def timeit(func: Any) -> Tuple[Any, float]:
+def timeit(func: Any = None, *, repeat: int = 1, warmup: int = 0, profile: Union[bool, str] = False,
+           profile_top: int = 20) -> Tuple[Any, float]:
     """A wrapper function to measure the execution time of a given function.
+
+    Can be used as @timeit, or as @timeit(repeat=5, warmup=1) to run the function several times.
     Args:
         func: the function to be executed and timed
+        repeat: number of timed runs; the reported execution time is their median
+        warmup: number of untimed runs before the timed ones
+        profile: profile the timed runs with cProfile (True or 'cprofile') or the sampling profiler
+            ('sampling'), print the hottest functions and keep the profile as wrapper.last_profile
+        profile_top: number of the hottest functions to print
     Returns:
         a tuple containing the result of the function and the execution time in seconds
+    Raises:
+        ValueError: if repeat is smaller than 1 or warmup is negative
     """
-    
+    if repeat < 1:
+        raise ValueError(f"repeat must be at least 1, got {repeat}")
+    if warmup < 0:
+        raise ValueError(f"warmup must not be negative, got {warmup}")
+    if func is None:
+        return lambda f: timeit(f, repeat=repeat, warmup=warmup, profile=profile, profile_top=profile_top)
+
     # Preserve the metadata of the original function with the 'wraps' decorator
     @wraps(func)
     def wrapper(*args, **kwargs):
-        # Record the start time using the perf_counter() function
-        start_time = perf_counter()
-        
-        # Execute the function with the given arguments and store the result
-        result = func(*args, **kwargs)
-        
-        # Record the end time and calculate the execution time in seconds
-        end_time = perf_counter()
-        execution_time = end_time - start_time
-        
+        # Warm up caches without recording the time
+        for _ in range(warmup):
+            func(*args, **kwargs)
+
+        call_profile = None
+        if profile:
+            from .profiling import CallProfile, resolve_profile_mode
+            call_profile = CallProfile(resolve_profile_mode(profile))
+
+        samples = []
+        for _ in range(repeat):
+            # Record the start time using the perf_counter() function
+            start_time = perf_counter()
+
+            # Execute the function with the given arguments and store the result
+            if call_profile is None:
+                result = func(*args, **kwargs)
+            else:
+                with call_profile:
+                    result = func(*args, **kwargs)
+
+            # Record the end time and calculate the execution time in seconds
+            end_time = perf_counter()
+            samples.append(end_time - start_time)
+        summary = summarize_timings(samples)
+        execution_time = summary['median']
+
         # Print the function name and execution time to the console with 5 decimal places
-        print(f"Function '{func.__name__}' took {execution_time:.5f} seconds to execute.")
-        
+        if repeat == 1:
+            print(f"Function '{func.__name__}' took {execution_time:.5f} seconds to execute.")
+        else:
+            print(f"Function '{func.__name__}' took {execution_time:.5f} seconds to execute "
+                  f"(median of {repeat} runs, min {summary['min']:.5f}, p95 {summary['p95']:.5f}, "
+                  f"stdev {summary['stdev']:.5f}).")
+        if call_profile is not None:
+            call_profile.print_top_functions(profile_top)
+            wrapper.last_profile = call_profile
+
         # Return the result and execution time as a tuple
         return result, execution_time
-    
+
     # Return the wrapper function as a callable object
+    wrapper.last_profile = None
     return wrapper
+
+
+def summarize_timings(samples: List[float]) -> Dict[str, float]:
+    """Returns the min, median, 95th percentile and standard deviation of a list of timings."""
+    ordered = sorted(samples)
+    # Nearest-rank percentile, so the p95 is always one of the measured runs.
+    p95 = ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+    return {
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'p95': p95,
+        'stdev': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+
+
+def evict_from_page_cache(file_path: str) -> bool:
+    """Asks the OS to drop a file from the page cache so the next read comes from disk.
+
+    Returns False where os.posix_fadvise is not available (e.g. Windows and macOS).
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        # Dirty pages are not evicted, so a freshly written file has to be flushed first.
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return True
@@ -1,64 +1,403 @@
-from typing import List, Optional, IO
+from typing import Dict, List, Optional, IO, Sequence, Tuple
 from pathlib import Path
-import seaborn as sns
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import math
+import shutil
+import subprocess
+import sys
 import os
+import warnings
+import numpy as np
 import pandas as pd
 import fasting_pandas as fp
 
 PROJECT_DIR = Path().absolute()
 DATA_DIR = os.path.join(PROJECT_DIR, 'data')
+BENCHMARK_FORMATS = ['csv', 'csv-gzip', 'csv-usecols', 'json', 'pickle', 'pickle-gzip',
+                     'parquet', 'parquet-zstd', 'parquet-uncompressed', 'parquet-rg100k', 'parquet-columns',
+                     'feather', 'feather-uncompressed', 'feather-mmap', 'feather-columns', 'hdf5']
+# Every group generates the same data for a size, so raw and optimized cells differ only in their dtypes.
+DATASET_SEED = 0
+# Resume only continues runs started by set_benchmarks, not e.g. a multi-file reads run in the same database.
+MATRIX_RUN_KIND = 'matrix'
 
 
-def set_benchmarks(df_sizes: List[int], file_formats: List[str], db: Optional[str] = None) -> pd.DataFrame:
-    # If db is not None then save results to a local database.
+def build_benchmark_matrix(df_sizes: List[int], file_formats: List[str]) -> List[Tuple[int, bool, str]]:
+    """
+    Returns every (size, is_datatype_optimized, file_format) cell of the benchmark, in run order.
+
+    File formats are names in the fasting_pandas.FORMATS registry. Variants whose dependencies are not
+    installed are skipped with a warning.
+    """
+    available = []
+    for file_format in file_formats:
+        if fp.get_format(file_format).available:
+            available.append(file_format)
+        else:
+            warnings.warn(f"Skipping {file_format}: it requires {', '.join(fp.get_format(file_format).requires)}")
+    return [(size, optimized, file_format)
+            for size in df_sizes for optimized in (False, True) for file_format in available]
+
+
+def _result_to_row(result: fp.TimedResult, file_format: str, optimized: bool) -> dict:
+    """Flattens a TimedResult into a row of the benchmark results DataFrame. Sizes are in MiB, as everywhere else."""
+    return {
+        'method_name': result.method_name,
+        'file_format': file_format,
+        'dataframe_size': result.shape[0],
+        'is_datatype_optimized': optimized,
+        'time_seconds': result.elapsed_time,
+        'time_min_seconds': result.min_time,
+        'time_p95_seconds': result.p95_time,
+        'cpu_time_seconds': result.cpu_time,
+        'memory_usage_mb': result.memory_usage / 1024 ** 2,
+        'peak_rss_delta_mb': result.peak_rss_delta / 1024 ** 2 if result.peak_rss_delta is not None else None,
+        'file_size_mb': result.file_size / 1024 ** 2 if result.file_size is not None else None
+    }
+
+
+def _run_benchmark_group(size: int, optimized: bool, file_formats: List[str], db: Optional[str] = None,
+                         run_id: Optional[str] = None, repeat: int = 1, warmup: int = 0,
+                         drop_page_cache: bool = False,
+                         dataset_cache: Optional[str] = None) -> Tuple[List[dict], Optional[Dict[str, int]]]:
+    """
+    Generates (or loads from the dataset cache) one dataset and benchmarks writing and reading it in every format.
+
+    Returns the result rows and the hit and miss counts of the dataset cache, if one was used.
+    """
+    cache_stats = None
+    if dataset_cache:
+        cache = fp.DatasetCache(dataset_cache)
+        # Read into memory rather than memory-mapped, so page-ins are not charged to the first timed write.
+        df = cache.get('teamresult', size, seed=DATASET_SEED, optimized=optimized, memory_map=False)
+        cache_stats = {'hits': cache.hits, 'misses': cache.misses}
+    else:
+        # The optimized frame is converted from the raw one, not generated in optimized dtypes, which
+        # draws different random values.
+        df = fp.datasets.generate_teamresult_df(size, seed=DATASET_SEED)
+        if optimized:
+            df = fp.datasets.set_dtypes_for_teamresult_df(df, inplace=True)
+    tdf = fp.TimedPandas(df)
+    rows = []
+    with fp.ResultStore(db, run_id=run_id) if db else nullcontext() as store:
+        for file_format in file_formats:
+            extension = fp.get_format(file_format).extension
+            file_name = f"dataset_{size}_{'optimized' if optimized else 'raw'}_{file_format}.{extension}"
+            file_path = os.path.join(DATA_DIR, file_name)
+            tags = {'is_datatype_optimized': optimized}
+            # Write
+            _, result = tdf.time_format(file_format, file_path, store=store,
+                                        repeat=repeat, warmup=warmup, tags=tags)
+            rows.append(_result_to_row(result, file_format, optimized))
+            # Read
+            _, result = tdf.time_format(file_format, file_path, read=True, store=store,
+                                        repeat=repeat, warmup=warmup, drop_page_cache=drop_page_cache, tags=tags)
+            rows.append(_result_to_row(result, file_format, optimized))
+
+    return rows, cache_stats
+
+
+def _load_completed_cells(db: str, run_id: str,
+                          matrix: List[Tuple[int, bool, str]]) -> Dict[Tuple[int, bool, str], List[dict]]:
+    """Returns the result rows of the matrix cells whose write and read are both saved under run_id."""
+    found = {}
+    with fp.ResultStore(db) as store:
+        for result in store.iter_results(run_id=run_id):
+            # Only the write and read timings of the matrix are cells.
+            if 'file_format' not in result.tags or 'is_datatype_optimized' not in result.tags:
+                continue
+            file_format, optimized = result.tags['file_format'], result.tags['is_datatype_optimized']
+            cell = (result.shape[0], optimized, file_format)
+            # The latest result of a method wins when a cell was run more than once.
+            found.setdefault(cell, {})[result.method_name] = _result_to_row(result, file_format, optimized)
+    completed = {}
+    for cell in matrix:
+        file_format = cell[2]
+        methods = found.get(cell, {})
+        if f'to_{file_format}' in methods and f'read_{file_format}' in methods:
+            completed[cell] = [methods[f'to_{file_format}'], methods[f'read_{file_format}']]
+
+    return completed
+
+
+def set_benchmarks(df_sizes: List[int], file_formats: List[str], db: Optional[str] = None,
+                   repeat: int = 1, warmup: int = 0, drop_page_cache: bool = False,
+                   concurrency: int = 1, isolated: bool = False, resume: bool = False,
+                   run_id: Optional[str] = None, label: Optional[str] = None,
+                   dataset_cache: Optional[str] = None) -> pd.DataFrame:
+    """
+    Time writing and reading the team result DataFrame for every size, dtype optimization and file format.
+
+    The matrix of cells is built up front and grouped by (size, optimized), so each dataset is generated
+    once and shared by all of its formats. Groups run in a process pool of `concurrency` workers.
+
+    Args:
+        df_sizes (list of int): Number of rows of the datasets.
+        file_formats (list of str): Format variants to write and read, e.g. ['csv', 'parquet-zstd'].
+            See fasting_pandas.FORMATS for the registered variants.
+        db (str, optional): SQLite database to save every timing to, under a run recording the git commit,
+            library versions and host. Compare runs with `python -m fasting_pandas`.
+        repeat, warmup, drop_page_cache: See TimedPandas.time.
+        concurrency (int): Number of groups to run at the same time.
+        isolated (bool): Run one group at a time, each in a fresh process, for clean timings and memory peaks.
+        resume (bool): Skip the cells already saved to the run, e.g. after a crash, and return their saved results.
+        run_id (str, optional): Save to this existing run. Defaults to a new run, or with resume to the latest
+            run started by set_benchmarks.
+        label (str, optional): Description of the new run, e.g. 'pandas 2.2 upgrade'.
+        dataset_cache (str, optional): Directory of a fasting_pandas.DatasetCache. The datasets are then
+            generated once and memory-mapped from the cache on later runs.
+
+    Returns:
+        pd.DataFrame: One row per timed write or read. With a dataset_cache, attrs['dataset_cache'] holds
+            the cache hits and misses of the groups that ran.
+    """
+    matrix = build_benchmark_matrix(df_sizes, file_formats)
+    completed = {}
     if db:
-        db = db
+        if run_id is None and resume and os.path.exists(db):
+            run_id = fp.runs.latest_run(db, kind=MATRIX_RUN_KIND)
+        if run_id is None:
+            run_id = fp.runs.start_run(db, label=label, kind=MATRIX_RUN_KIND)
+        if resume:
+            completed = _load_completed_cells(db, run_id, matrix)
+
+    groups = {}
+    for size, optimized, file_format in matrix:
+        if (size, optimized, file_format) not in completed:
+            groups.setdefault((size, optimized), []).append(file_format)
+    options = {'db': db, 'run_id': run_id, 'repeat': repeat, 'warmup': warmup, 'drop_page_cache': drop_page_cache,
+               'dataset_cache': dataset_cache}
+
+    group_rows = {}
+    if isolated:
+        for (size, optimized), formats in groups.items():
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                group_rows[(size, optimized)] = executor.submit(
+                    _run_benchmark_group, size, optimized, formats, **options).result()
+    elif concurrency > 1:
+        with ProcessPoolExecutor(max_workers=concurrency) as executor:
+            futures = {group: executor.submit(_run_benchmark_group, *group, formats, **options)
+                       for group, formats in groups.items()}
+            group_rows = {group: future.result() for group, future in futures.items()}
+    else:
+        for (size, optimized), formats in groups.items():
+            group_rows[(size, optimized)] = _run_benchmark_group(size, optimized, formats, **options)
+
+    # Collect the rows in matrix order, then build the DataFrame once.
+    rows = []
+    for size, optimized, file_format in matrix:
+        if (size, optimized, file_format) in completed:
+            rows.extend(completed[(size, optimized, file_format)])
+        else:
+            rows.extend(row for row in group_rows[(size, optimized)][0]
+                        if row['file_format'] == file_format)
+
+    benchmarks = pd.DataFrame(rows)
+    if dataset_cache:
+        benchmarks.attrs['dataset_cache'] = {
+            counter: sum(stats[counter] for _, stats in group_rows.values()) for counter in ('hits', 'misses')}
+    return benchmarks
 
-    # Create an empty DataFrame to store the results
-    results_df = pd.DataFrame()
 
+def _measure_generation(route: str, size: int) -> dict:
+    """Generates a team result DataFrame through the given route and measures it. Runs in a fresh process."""
+    with fp.TimedContext(None) as c:
+        if route == 'generate_then_convert':
+            df = fp.datasets.set_dtypes_for_teamresult_df(fp.datasets.generate_teamresult_df(size))
+        else:
+            df = fp.datasets.generate_teamresult_df(size, optimized=True)
+
+    return {
+        'route': route,
+        'dataframe_size': size,
+        'time_seconds': c.elapsed_time,
+        'peak_rss_delta_mb': None if c.peak_rss_delta is None else c.peak_rss_delta / 1024 ** 2,
+        'memory_usage_mb': df.memory_usage(deep=True).sum() / 1024 ** 2
+    }
+
+
+def benchmark_generation(df_sizes: Sequence[int] = (1_000_000, 10_000_000, 20_000_000)) -> pd.DataFrame:
+    """
+    Compare generating the team result DataFrame with optimized dtypes against generating and then converting it.
+
+    Every measurement runs in its own process so the peak RSS of one route does not hide the other
+    on platforms where the peak cannot be reset.
+
+    Args:
+        df_sizes (list of int): Number of rows to generate.
+
+    Returns:
+        pd.DataFrame: One row per (route, size) with time, peak RSS growth and final memory usage.
+    """
+    results = []
     for size in df_sizes:
-        raw_df = fp.datasets.generate_teamresult_df(size)
-        optimized_df = fp.datasets.set_dtypes_for_teamresult_df(raw_df)
-
-        dfs = {False: raw_df, True: optimized_df}
-        for key, df in dfs.items():
-            tdf = fp.TimedPandas(df)
-
-            for file_format in file_formats:
-                if file_format == 'parquet':
-                    tdf.prob = tdf.prob.astype('float32')
-                file_name = f"dataset_{size}.{file_format}"
-                file_path = os.path.join(DATA_DIR, file_name)
-                # Write
-                _, result = tdf.time(
-                    f'to_{file_format}', file_path, db_path=db)
-                results_df = pd.concat([results_df, pd.DataFrame({
-                    'method_name': [result.method_name],
-                    'file_format': [file_format],
-                    'dataframe_size': [result.shape[0]],
-                    'is_datatype_optimized': [key],
-                    'time_seconds': [result.elapsed_time],
-                    'memory_usage_mb': [result.memory_usage / 1000],
-                    'file_size_mb': [result.file_size / 1000]
-                })],
-                    ignore_index=True)
-                # Read
-                _, result = tdf.time(
-                    f'read_{file_format}', file_path, db_path=db,  is_read_method=True)
-                results_df = pd.concat([results_df, pd.DataFrame({
-                    'method_name': [result.method_name],
-                    'file_format': [file_format],
-                    'dataframe_size': [result.shape[0]],
-                    'is_datatype_optimized': [key],
-                    'time_seconds': [result.elapsed_time],
-                    'memory_usage_mb': [result.memory_usage / 1000],
-                    'file_size_mb': [result.file_size / 1000]
-                })],
-                    ignore_index=True)
-
-    return results_df
+        for route in ['generate_then_convert', 'optimized']:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                results.append(executor.submit(_measure_generation, route, size).result())
+
+    return pd.DataFrame(results)
+
+
+def benchmark_multi_file_reads(n_files: int = 200, rows_per_file: int = 10_000, repeat: int = 3,
+                               file_formats: Sequence[str] = ('parquet', 'feather', 'csv'),
+                               worker_counts: Sequence[int] = (1, 2, 4, 8, 16),
+                               db: Optional[str] = None) -> pd.DataFrame:
+    """
+    Compare reading many small partitions one after the other against reading them concurrently.
+
+    Args:
+        n_files (int): Number of partition files per format.
+        rows_per_file (int): Number of rows of every partition.
+        repeat (int): Timed reads of all the partitions per (format, mode, workers). The median is reported.
+        file_formats (list of str): Format variants to write the partitions with.
+        worker_counts (list of int): Concurrent reads to try with the thread pool and asyncio readers.
+        db (str, optional): SQLite database to save every timing to.
+
+    Returns:
+        pd.DataFrame: One row per (format, mode, workers) with the total time, the aggregate throughput
+            and the median and p95 per-file latency.
+    """
+    runs = [('sequential', 1)] + [(mode, workers) for workers in worker_counts for mode in ('threads', 'asyncio')]
+    results = []
+    run_id = fp.start_run(db, label='multi-file reads', kind='multi-file reads') if db else None
+    with fp.ResultStore(db, run_id=run_id) if db else nullcontext() as store:
+        for file_format in file_formats:
+            file_format = fp.get_format(file_format)
+            partition_dir = os.path.join(DATA_DIR, f'partitions_{file_format.name}')
+            os.makedirs(partition_dir, exist_ok=True)
+            for i in range(n_files):
+                df = fp.datasets.generate_teamresult_df(rows_per_file, optimized=True, seed=i)
+                file_format.write(df, os.path.join(partition_dir, f'part-{i:05d}.{file_format.extension}'))
+            try:
+                for mode, workers in runs:
+                    _, result = fp.read_files(os.path.join(partition_dir, f'*.{file_format.extension}'),
+                                              mode=mode, workers=workers, repeat=repeat, store=store,
+                                              tags={'file_format': file_format.name})
+                    latency = fp.summarize_timings(result.latencies)
+                    results.append({
+                        'file_format': file_format.name,
+                        'mode': mode,
+                        'workers': workers,
+                        'time_seconds': result.elapsed_time,
+                        'mb_per_second': result.mb_per_second,
+                        'rows_per_second': result.rows_per_second,
+                        'latency_median_seconds': latency['median'],
+                        'latency_p95_seconds': latency['p95'],
+                    })
+            finally:
+                shutil.rmtree(partition_dir)
+
+    return pd.DataFrame(results)
+
+
+def calculate_my_reward(row: pd.Series) -> str:
+    """The row-wise reward rule from Lesson 1."""
+    if (row['study_time'] >= 4) & (row['test_1_score'] >= 0.9):
+        return row['happy_food']
+    elif (row['test_1_score'] >= 0.65) & (row['age'] <= 13):
+        return row['happy_food']
+    return row['sad_food']
+
+
+REWARD_RULES = [
+    ('study_time >= 4 & test_1_score >= 0.9', 'happy_food'),
+    ('test_1_score >= 0.65 & age <= 13', 'happy_food'),
+]
+
+
+def benchmark_rules(df_sizes: Sequence[int] = (10_000, 1_000_000, 10_000_000), apply_limit: int = 1_000_000,
+                    chunk_rows: int = 1_000_000, n_workers: Optional[int] = None,
+                    parallel_chunk_rows: Optional[int] = None) -> pd.DataFrame:
+    """
+    Compare the rule engine and the multi-core apply against the Lesson 1 techniques for calculate_my_reward.
+
+    Args:
+        df_sizes (list of int): Number of rows of the test score DataFrame.
+        apply_limit (int): Skip iterrows and the row-wise apply above this many rows, where they take minutes.
+        chunk_rows (int): Rows per chunk for the chunked rule engine.
+        n_workers (int, optional): Worker processes for parallel_apply. Defaults to the number of CPUs.
+        parallel_chunk_rows (int, optional): Rows per parallel_apply task. Defaults to an equal share of
+            the rows per worker, so every worker gets work at every size.
+
+    Returns:
+        pd.DataFrame: One row per (technique, size) with the elapsed time in seconds.
+    """
+    workers = n_workers or os.cpu_count() or 1
+    techniques = {
+        'iterrows': lambda df: [calculate_my_reward(row) for _, row in df.iterrows()],
+        'apply': lambda df: df.apply(calculate_my_reward, axis=1),
+        'parallel_apply': lambda df: fp.parallel_apply(
+            df, calculate_my_reward, n_workers=workers,
+            chunk_rows=parallel_chunk_rows or max(math.ceil(len(df) / workers), 1)),
+        'numpy_where_values': lambda df: np.where(
+            (df['study_time'].values >= 4) & (df['test_1_score'].values >= 0.9) |
+            (df['test_1_score'].values >= 0.65) & (df['age'].values <= 13),
+            df['happy_food'].values,
+            df['sad_food'].values),
+        'rule_engine': lambda df: fp.select_rules(df, REWARD_RULES, default='sad_food'),
+        'rule_engine_chunked': lambda df: fp.select_rules(df, REWARD_RULES, default='sad_food',
+                                                          chunk_rows=chunk_rows),
+    }
+    results = []
+    for size in df_sizes:
+        df = fp.generate_testscore_df(size)
+        for technique, func in techniques.items():
+            if technique in ('iterrows', 'apply') and size > apply_limit:
+                continue
+            with fp.TimedContext(df) as c:
+                func(df)
+            results.append({'technique': technique, 'dataframe_size': size, 'time_seconds': c.elapsed_time})
+
+    return pd.DataFrame(results)
+
+
+def _parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """Returns the self and cumulative microseconds of every module in `python -X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        modules[module.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def benchmark_import_time(targets: Sequence[str] = ('fasting_pandas', 'fasting_pandas.core', 'main'),
+                          repeat: int = 5, top: int = 5) -> pd.DataFrame:
+    """
+    Measure how long importing the package and the benchmark script takes in a fresh interpreter.
+
+    Every target is imported `repeat` times with `python -X importtime`, so nothing is cached in sys.modules.
+
+    Args:
+        targets (list of str): Modules to import.
+        repeat (int): Number of fresh interpreters per target. The median is reported.
+        top (int): Number of the slowest imported modules (by self time) to list per target.
+
+    Returns:
+        pd.DataFrame: One row per target with the median and min import time in seconds and its slowest modules.
+    """
+    results = []
+    for target in targets:
+        runs = []
+        for _ in range(repeat):
+            completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+                                       cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+            runs.append(_parse_importtime(completed.stderr))
+        totals = [modules[target][1] for modules in runs]
+        self_times = pd.DataFrame({module: times[0] for module, times in modules.items()}
+                                  for modules in runs).median()
+        results.append({
+            'target': target,
+            'import_seconds': np.median(totals) / 1e6,
+            'import_min_seconds': min(totals) / 1e6,
+            'n_modules': len(runs[0]),
+            'slowest_modules': ', '.join(f'{module} ({self_us / 1e3:.1f} ms)'
+                                         for module, self_us in self_times.nlargest(top).items()),
+        })
+
+    return pd.DataFrame(results)
 
 
 def create_plots(timed_results: pd.DataFrame, save: Optional[bool] = False, save_path: Optional[str] = None) -> Optional[IO]:
@@ -70,6 +409,10 @@ def create_plots(timed_results: pd.DataFrame, save: Optional[bool] = False, save
         save (bool): Will save results in png format instead of showing them.
         save_path (str): Directory to save the files. If none will default to data/.
     """
+    # Plotting libraries take longer to import than the benchmarks themselves on small sizes.
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
     if save and not save_path:
         save_path = DATA_DIR
     # Create a lineplot of time vs file type read and write
@@ -88,7 +431,7 @@ def create_plots(timed_results: pd.DataFrame, save: Optional[bool] = False, save
     sns.scatterplot(x='time_seconds', y='memory_usage_mb',
                     hue='method_name', data=timed_results)
     plt.xlabel('Time (seconds)')
-    plt.ylabel('Memory Usage (MB)')
+    plt.ylabel('Memory Usage (MiB)')
     plt.title('Time vs Memory Usage')
     if save:
         plt.savefig(os.path.join(save_path, 'time_vs_memory_usage.png'))
@@ -98,7 +441,7 @@ def create_plots(timed_results: pd.DataFrame, save: Optional[bool] = False, save
     # Create scatterplot of file_size_mb vs time
     sns.scatterplot(x='file_size_mb', y='time_seconds',
                     hue='method_name', data=timed_results)
-    plt.xlabel('file_size_mb (MB)')
+    plt.xlabel('file_size_mb (MiB)')
     plt.ylabel('Time (seconds)')
     plt.title('file_size_mb vs Time')
     if save:
@@ -126,7 +469,7 @@ def create_plots(timed_results: pd.DataFrame, save: Optional[bool] = False, save
     sns.scatterplot(x='time_seconds', y='memory_usage_mb',
                     hue='dataframe_size', data=grouped_results)
     plt.xlabel('Time (seconds)')
-    plt.ylabel('Memory Usage (MB)')
+    plt.ylabel('Memory Usage (MiB)')
     plt.title('Time vs Memory Usage, Grouped by Size of DataFrame')
     if save:
         plt.savefig(os.path.join(
@@ -137,7 +480,7 @@ def create_plots(timed_results: pd.DataFrame, save: Optional[bool] = False, save
     # Create scatterplot of file_size_mb vs time, grouped by size of the dataframe
     sns.scatterplot(x='file_size_mb', y='time_seconds',
                     hue='dataframe_size', data=timed_results)
-    plt.xlabel('file_size_mb (MB)')
+    plt.xlabel('file_size_mb (MiB)')
     plt.ylabel('time_seconds')
     plt.title('file_size_mb vs Time, Grouped by Size of DataFrame')
     if save:
@@ -178,15 +521,17 @@ def cleanup(dir_path: str, *file_formats: str, all: bool = False) -> None:
 
 
 def main():
-    # For simplicity we will nuke the database to start from scratch.
-    cleanup(DATA_DIR, ['db'])
-    # We will generate benchmark data and save it to the database.
-    benchmarks = set_benchmarks([1_000, 100_000, 1_000_000, 10_000_000], [
-                                'csv', 'json', 'pickle', 'parquet'], db= os.path.join(DATA_DIR, 'benchmarks.db'))
+    # We will generate benchmark data and save it to the database as a new run, next to the earlier
+    # runs, so they can be compared with `python -m fasting_pandas data/benchmarks.db compare previous`.
+    benchmarks = set_benchmarks([1_000, 100_000, 1_000_000, 10_000_000], BENCHMARK_FORMATS,
+                                db=os.path.join(DATA_DIR, 'benchmarks.db'),
+                                dataset_cache=os.path.join(DATA_DIR, 'dataset_cache'))
+    print(f"Dataset cache: {benchmarks.attrs['dataset_cache']['hits']} hit(s), "
+          f"{benchmarks.attrs['dataset_cache']['misses']} miss(es)")
     # Generate some simple graphs. I honestly just did some random plots without purpose.
     create_plots(benchmarks, save=True)
     # Remove junk testing files.
-    cleanup(DATA_DIR, ['csv', 'json', 'pickle', 'parquet'])
+    cleanup(DATA_DIR, sorted({fp.get_format(name).extension.split('.')[-1] for name in BENCHMARK_FORMATS}))
 
 
 if __name__ == '__main__':
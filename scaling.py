@@ -0,0 +1,260 @@
+from typing import Dict, List, Optional
+import argparse
+import json
+import os
+from contextlib import nullcontext
+import numpy as np
+import pandas as pd
+import fasting_pandas as fp
+from main import DATA_DIR
+
+SCALING_FORMATS = ['csv', 'pickle', 'parquet', 'feather']
+BASE_POINT = {'rows': 100_000, 'columns': 10, 'width': 8, 'cardinality': 100, 'threads': os.cpu_count() or 1}
+SWEEPS = {
+    'rows': [10_000, 100_000, 1_000_000, 10_000_000],
+    'columns': [5, 10, 50, 100],
+    'width': [4, 16, 64],
+    'cardinality': [10, 1_000, 100_000],
+    'threads': sorted({1, 2, 4, os.cpu_count() or 1}),
+}
+QUICK_SWEEPS = {
+    'rows': [1_000, 10_000, 100_000],
+    'columns': [5, 20],
+    'width': [4, 32],
+    'cardinality': [10, 10_000],
+    'threads': sorted({1, os.cpu_count() or 1}),
+}
+# A format falls off a cliff when its throughput drops below this fraction of the best smaller size.
+CLIFF_RATIO = 0.5
+
+
+def set_threads(threads: int) -> None:
+    """
+    Sets the Arrow CPU and I/O thread pools, and the NumPy BLAS threads when threadpoolctl is installed.
+
+    NumPy's own loops (and pandas on top of them) are single-threaded, so without threadpoolctl the sweep
+    only measures the Arrow-backed formats.
+    """
+    import pyarrow as pa
+    pa.set_cpu_count(threads)
+    pa.set_io_thread_count(threads)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(threads)
+
+
+def _physical_memory() -> Optional[int]:
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def _measure_point(axis: str, point: dict, file_formats: List[str], store: Optional[fp.ResultStore],
+                   repeat: int) -> List[dict]:
+    """Writes and reads one generated frame in every format, for both dtype flavours."""
+    set_threads(point['threads'])
+    rows = []
+    for optimized in (False, True):
+        df = fp.generate_wide_df(point['rows'], point['columns'], point['width'], point['cardinality'],
+                                 optimized=optimized, seed=0)
+        tdf = fp.TimedPandas(df)
+        for file_format in file_formats:
+            file_format = fp.get_format(file_format)
+            file_path = os.path.join(DATA_DIR, f"scaling_{'optimized' if optimized else 'raw'}.{file_format.extension}")
+            tags = {'is_datatype_optimized': optimized, 'axis': axis, **point}
+            try:
+                for read in (False, True):
+                    _, result = tdf.time_format(file_format, file_path, read=read, store=store, repeat=repeat,
+                                                tags=tags)
+                    rows.append({
+                        'axis': axis,
+                        **point,
+                        'file_format': file_format.name,
+                        'is_datatype_optimized': optimized,
+                        'operation': 'read' if read else 'write',
+                        'time_seconds': result.elapsed_time,
+                        'rows_per_second': result.rows_per_second,
+                        'mb_per_second': result.mb_per_second,
+                        'file_size_mb': None if result.file_size is None else result.file_size / 1024 ** 2,
+                        'memory_per_row': result.memory_usage / point['rows'],
+                        'peak_rss_delta_mb': (None if result.peak_rss_delta is None
+                                              else result.peak_rss_delta / 1024 ** 2),
+                    })
+            finally:
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+
+    return rows
+
+
+def run_sweeps(sweeps: Optional[Dict[str, List[int]]] = None, base_point: Optional[dict] = None,
+               file_formats: Optional[List[str]] = None, repeat: int = 3, db: Optional[str] = None) -> pd.DataFrame:
+    """
+    Sweep one dimension at a time around base_point and time writing and reading every format.
+
+    Args:
+        sweeps (dict, optional): Values per axis: rows, columns, width (characters per string), cardinality
+            (distinct strings per column) and threads (Arrow and BLAS threads). Defaults to SWEEPS.
+        base_point (dict, optional): The value of every axis while another one is swept. Defaults to BASE_POINT.
+        file_formats (list of str, optional): Format variants to benchmark. Defaults to SCALING_FORMATS.
+        repeat (int): Timed runs per measurement. The median is reported.
+        db (str, optional): SQLite database to save every timing to, as a new run.
+
+    Returns:
+        pd.DataFrame: One row per (axis, value, format, optimized, operation).
+    """
+    sweeps = SWEEPS if sweeps is None else sweeps
+    base_point = BASE_POINT if base_point is None else base_point
+    file_formats = SCALING_FORMATS if file_formats is None else file_formats
+    rows = []
+    with fp.ResultStore(db, run_id=fp.start_run(db, label='scaling', kind='scaling')) if db else nullcontext() as store:
+        try:
+            for axis, values in sweeps.items():
+                for value in values:
+                    rows.extend(_measure_point(axis, {**base_point, axis: value}, file_formats, store, repeat))
+        finally:
+            set_threads(os.cpu_count() or 1)
+
+    return pd.DataFrame(rows)
+
+
+def _fit_power_law(x: np.ndarray, y: np.ndarray) -> Optional[dict]:
+    """Fits y = coefficient * x ** exponent by least squares in log-log space."""
+    valid = (x > 0) & (y > 0)
+    if valid.sum() < 2 or len(np.unique(x[valid])) < 2:
+        return None
+    log_x, log_y = np.log(x[valid]), np.log(y[valid])
+    exponent, intercept = np.polyfit(log_x, log_y, 1)
+    residuals = log_y - (exponent * log_x + intercept)
+    total = ((log_y - log_y.mean()) ** 2).sum()
+    return {'exponent': float(exponent), 'coefficient': float(np.exp(intercept)),
+            'r_squared': float(1 - (residuals ** 2).sum() / total) if total else 1.0}
+
+
+def fit_curves(results: pd.DataFrame) -> List[dict]:
+    """
+    Fits throughput (rows/s and MB/s) and memory per row against the swept value of every axis.
+
+    An exponent near 0 means the metric does not depend on the axis; for rows, a negative throughput
+    exponent means the format gets slower per row as tables grow.
+    """
+    fits = []
+    for (axis, file_format, optimized, operation), group in results.groupby(
+            ['axis', 'file_format', 'is_datatype_optimized', 'operation']):
+        x = group[axis].to_numpy(dtype=float)
+        for metric in ('rows_per_second', 'mb_per_second', 'memory_per_row'):
+            fit = _fit_power_law(x, group[metric].to_numpy(dtype=float))
+            if fit is not None:
+                fits.append({'axis': axis, 'file_format': file_format, 'is_datatype_optimized': bool(optimized),
+                             'operation': operation, 'metric': metric, **fit})
+
+    return fits
+
+
+def detect_cliffs(results: pd.DataFrame, cliff_ratio: float = CLIFF_RATIO) -> List[dict]:
+    """
+    Returns the first row count where each format's throughput falls below cliff_ratio of its best smaller size.
+
+    The peak RSS growth of that measurement is reported next to the physical memory, so a cliff caused by
+    swapping can be told apart from one caused by the format itself.
+    """
+    cliffs = []
+    memory = _physical_memory()
+    by_rows = results[results['axis'] == 'rows']
+    for (file_format, optimized, operation), group in by_rows.groupby(
+            ['file_format', 'is_datatype_optimized', 'operation']):
+        group = group.sort_values('rows')
+        best = group['rows_per_second'].cummax().shift()
+        dropped = group[group['rows_per_second'] < best * cliff_ratio]
+        if dropped.empty:
+            continue
+        cliff = dropped.iloc[0]
+        peak_rss = None if pd.isna(cliff['peak_rss_delta_mb']) else cliff['peak_rss_delta_mb'] * 1024 ** 2
+        cliffs.append({
+            'file_format': file_format,
+            'is_datatype_optimized': bool(optimized),
+            'operation': operation,
+            'rows': int(cliff['rows']),
+            'rows_per_second': float(cliff['rows_per_second']),
+            'best_smaller_rows_per_second': float(best.loc[cliff.name]),
+            'peak_rss_fraction_of_memory': None if peak_rss is None or not memory else peak_rss / memory,
+        })
+
+    return cliffs
+
+
+def recommend_formats(results: pd.DataFrame) -> List[dict]:
+    """Returns the fastest format to write and to read at every swept row count, per dtype flavour."""
+    recommendations = []
+    by_rows = results[results['axis'] == 'rows']
+    for (rows, optimized, operation), group in by_rows.groupby(['rows', 'is_datatype_optimized', 'operation']):
+        fastest = group.loc[group['time_seconds'].idxmin()]
+        smallest = group.loc[group['file_size_mb'].idxmin()]
+        recommendations.append({'rows': int(rows), 'is_datatype_optimized': bool(optimized), 'operation': operation,
+                                'fastest_format': fastest['file_format'],
+                                'fastest_time_seconds': float(fastest['time_seconds']),
+                                'smallest_format': smallest['file_format']})
+
+    return recommendations
+
+
+def summarize(results: pd.DataFrame, base_point: Optional[dict] = None) -> dict:
+    """Builds the machine-readable summary of a sweep: environment, fits, cliffs and format recommendations."""
+    return {
+        'environment': {**fp.runs.collect_environment(), 'physical_memory': _physical_memory()},
+        'base_point': BASE_POINT if base_point is None else base_point,
+        'fits': fit_curves(results),
+        'cliffs': detect_cliffs(results),
+        'recommendations': recommend_formats(results),
+    }
+
+
+def plot_scaling(results: pd.DataFrame, output_dir: str) -> List[str]:
+    """Saves one throughput and one memory-per-row plot per axis and returns their paths."""
+    # Plotting libraries take longer to import than the benchmarks themselves on small sizes.
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
+    paths = []
+    for axis, group in results.groupby('axis'):
+        for metric in ('rows_per_second', 'memory_per_row'):
+            grid = sns.relplot(data=group, x=axis, y=metric, hue='file_format', style='is_datatype_optimized',
+                               col='operation', kind='line', markers=True)
+            grid.set(xscale='log', yscale='log')
+            grid.figure.suptitle(f'{metric} vs {axis}', y=1.02)
+            path = os.path.join(output_dir, f'scaling_{metric}_vs_{axis}.png')
+            grid.savefig(path)
+            plt.close(grid.figure)
+            paths.append(path)
+
+    return paths
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Sweep rows, columns, string width, cardinality and threads '
+                                                 'and write throughput fits, cliffs and plots.')
+    parser.add_argument('--output-dir', default=os.path.join(DATA_DIR, 'scaling'))
+    parser.add_argument('--formats', nargs='+', default=SCALING_FORMATS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--quick', action='store_true', help='small sizes, to check the setup')
+    parser.add_argument('--db', default=None, help='SQLite database to save every timing to')
+    parser.add_argument('--no-plots', action='store_true')
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    sweeps = QUICK_SWEEPS if args.quick else SWEEPS
+    base_point = {**BASE_POINT, 'rows': 10_000} if args.quick else BASE_POINT
+    results = run_sweeps(sweeps, base_point, args.formats, repeat=args.repeat, db=args.db)
+    results.to_csv(os.path.join(args.output_dir, 'scaling_results.csv'), index=False)
+    summary = summarize(results, base_point)
+    if not args.no_plots:
+        summary['plots'] = plot_scaling(results, args.output_dir)
+    with open(os.path.join(args.output_dir, 'scaling_summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
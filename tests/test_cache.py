@@ -0,0 +1,49 @@
+import pandas as pd
+import pyarrow as pa
+
+from fasting_pandas.cache import DatasetCache
+from fasting_pandas.datasets import generate_teamresult_df, set_dtypes_for_teamresult_df
+
+
+def test_optimized_frames_hold_the_raw_values(tmp_path):
+    cache = DatasetCache(str(tmp_path))
+
+    raw = cache.get('teamresult', 1_000, seed=3)
+    optimized = cache.get('teamresult', 1_000, seed=3, optimized=True)
+
+    pd.testing.assert_frame_equal(raw, generate_teamresult_df(1_000, seed=3), check_dtype=False)
+    pd.testing.assert_frame_equal(optimized, set_dtypes_for_teamresult_df(raw), check_categorical=False)
+
+
+def test_hits_misses_and_in_memory_reads(tmp_path):
+    cache = DatasetCache(str(tmp_path))
+
+    generated = cache.get('testscore', 500)
+    mapped = cache.get('testscore', 500)
+    in_memory = cache.get('testscore', 500, memory_map=False)
+
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 1 and cache.stats()['files'] == 1
+    pd.testing.assert_frame_equal(mapped, generated)
+    pd.testing.assert_frame_equal(in_memory, mapped)
+
+
+def test_hits_are_not_copied_out_of_the_memory_map(tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    generated = cache.get('testscore', 200_000)
+
+    allocated = pa.total_allocated_bytes()
+    mapped = cache.get('testscore', 200_000)
+
+    numeric = generated.select_dtypes('number').memory_usage(index=False).sum()
+    assert pa.total_allocated_bytes() - allocated < numeric / 100
+    pd.testing.assert_frame_equal(mapped, generated)
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    cache = DatasetCache(str(tmp_path), max_bytes=1)
+
+    cache.get('testscore', 100, seed=1)
+    cache.get('testscore', 100, seed=2)
+
+    assert cache.stats()['files'] == 1 and cache.evictions == 1
+    assert cache.get('testscore', 100, seed=2) is not None and cache.hits == 1
@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+
+from fasting_pandas.datasets import (generate_teamresult_chunk, generate_teamresult_df, iter_teamresult_df,
+                                     set_dtypes_for_teamresult_df, write_chunks)
+
+
+def test_chunks_are_reproducible_by_index():
+    chunks = list(iter_teamresult_df(250, chunk_size=100, seed=7))
+
+    assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+    pd.testing.assert_frame_equal(chunks[2], generate_teamresult_chunk(50, seed=7, chunk_index=2, offset=200))
+    assert pd.concat(chunks).index.equals(pd.RangeIndex(250))
+
+
+@pytest.mark.parametrize('file_format', ['csv', 'parquet'])
+def test_write_chunks_appends_every_chunk(tmp_path, file_format):
+    file_path = str(tmp_path / f'data.{file_format}')
+
+    rows = write_chunks(iter_teamresult_df(250, chunk_size=100, seed=0), file_path, file_format)
+
+    df = pd.read_csv(file_path) if file_format == 'csv' else pd.read_parquet(file_path)
+    assert rows == len(df) == 250
+
+
+def test_optimized_generation_has_the_converted_dtypes():
+    generated = generate_teamresult_df(100, optimized=True, seed=0)
+    converted = set_dtypes_for_teamresult_df(generate_teamresult_df(100, seed=0))
+
+    assert generated.dtypes.astype(str).to_dict() == converted.dtypes.astype(str).to_dict()
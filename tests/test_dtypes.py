@@ -0,0 +1,78 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fasting_pandas.dtypes import ColumnProfile, categorize, labels_to_bool, optimize_dtypes, parse_dates_cached
+
+
+def test_optimize_dtypes_downcasts_and_keeps_values():
+    df = pd.DataFrame({
+        'small': np.arange(100, dtype='int64'),
+        'wide': np.arange(100, dtype='int64') * 100_000,
+        'half': np.full(100, 0.5),
+        'team': ['yellow', 'cyan'] * 50,
+        'result': ['win', 'lose'] * 50,
+        'date': ['2020-01-01', '2020-01-02'] * 50,
+    })
+
+    optimized, report = optimize_dtypes(df)
+
+    assert optimized.dtypes.drop('date').astype(str).to_dict() == {
+        'small': 'int8', 'wide': 'int32', 'half': 'float16', 'team': 'category', 'result': 'bool'}
+    assert optimized['date'].dtype.kind == 'M'
+    assert (optimized['wide'] == df['wide']).all()
+    assert optimized['result'].tolist() == [True, False] * 50
+    assert list(report.index) == ['Index', *df.columns]
+    assert (report['memory_after'] <= report['memory_before']).all()
+    # The input is left alone unless inplace=True.
+    assert df['small'].dtype == 'int64'
+
+
+def test_only_strings_in_one_date_format_become_dates():
+    df = pd.DataFrame({'code': ['1-2', '3-4', '5-6'], 'mixed': ['2020-01-01', '01/02/2020', '2020-01-03'],
+                       'date': ['2020-01-31', '2020-02-29', '2020-03-31']})
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        optimized, _ = optimize_dtypes(df, category_ratio=0)
+
+    assert optimized['code'].tolist() == ['1-2', '3-4', '5-6']
+    assert optimized['mixed'].tolist() == df['mixed'].tolist()
+    assert optimized['date'].dtype.kind == 'M'
+
+
+def test_optimize_dtypes_checks_sampled_ranges_on_the_full_column():
+    values = np.zeros(1_000, dtype='int64')
+    values[-1] = 100_000
+    optimized, _ = optimize_dtypes(pd.DataFrame({'a': values}), sample=10)
+
+    assert optimized['a'].dtype == 'int32'
+    assert optimized['a'].iloc[-1] == 100_000
+
+
+def test_float_profile_rejects_lossy_downcast():
+    profile = ColumnProfile('x', float_rtol=1e-12).update(pd.Series([0.1, 123456.789]))
+
+    assert profile.resolve() is None
+
+
+def test_categorize_matches_astype_category():
+    series = pd.Series(['b', None, 'a', 'b', 'c'], dtype=object)
+
+    categorized = categorize(series)
+
+    pd.testing.assert_series_equal(categorized, series.astype('category'))
+
+
+def test_labels_to_bool_rejects_unknown_labels():
+    assert labels_to_bool(pd.Series(['win', 'lose'])).tolist() == [True, False]
+    with pytest.raises(ValueError):
+        labels_to_bool(pd.Series(['win', 'draw']))
+
+
+def test_parse_dates_cached_matches_to_datetime():
+    series = pd.Series(['2020-01-01', None, '2020-01-01', '2021-06-30'])
+
+    pd.testing.assert_series_equal(parse_dates_cached(series), pd.to_datetime(series))
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from fasting_pandas.datasets import generate_teamresult_df
+from fasting_pandas.fileio import convert_csv_to_parquet, infer_read_schema, read_csv_optimized, read_files
+
+
+def _write_csv(tmp_path, df):
+    csv_path = str(tmp_path / 'data.csv')
+    df.to_csv(csv_path, index=False)
+    return csv_path
+
+
+def test_read_csv_optimized_keeps_values_outside_the_sample(tmp_path):
+    ints = np.arange(200) % 100
+    floats = np.full(200, 0.5)
+    ints[150], floats[150] = 1000, 1e6
+    csv_path = _write_csv(tmp_path, pd.DataFrame({'a': ints, 'b': floats, 'team': ['yellow', 'cyan'] * 100}))
+
+    schema = infer_read_schema(csv_path, sample_rows=100, cache=False)
+    df = read_csv_optimized(csv_path, schema=schema)
+
+    assert 'a' not in schema['dtype'] and 'b' not in schema['dtype']
+    assert df['a'].iloc[150] == 1000 and df['a'].dtype == 'int16'
+    assert df['b'].iloc[150] == 1e6 and df['b'].dtype == 'float32'
+    assert isinstance(df['team'].dtype, pd.CategoricalDtype)
+
+
+def test_read_csv_optimized_keeps_labels_outside_the_sample(tmp_path):
+    labels = pd.DataFrame({'r': ['win', 'lose'] * 100 + ['draw'], 's': ['win', 'lose'] * 100 + ['lose']})
+    csv_path = _write_csv(tmp_path, labels)
+
+    schema = infer_read_schema(csv_path, sample_rows=100, cache=False)
+    df = read_csv_optimized(csv_path, schema=schema)
+
+    assert 'true_values' not in schema
+    assert isinstance(df['r'].dtype, pd.CategoricalDtype) and df['r'].iloc[-1] == 'draw'
+    assert df['s'].dtype == bool and df['s'].tolist() == [True, False] * 100 + [False]
+
+
+def test_full_scan_schema_types_numbers_while_parsing(tmp_path):
+    csv_path = _write_csv(tmp_path, pd.DataFrame({'a': [1, 1000], 'b': [0.5, 1e6]}))
+
+    schema = infer_read_schema(csv_path, full_scan=True, chunksize=1, cache=False)
+
+    assert schema['dtype'] == {'a': 'int16', 'b': 'float32'}
+    assert read_csv_optimized(csv_path, schema=schema)['a'].tolist() == [1, 1000]
+
+
+def test_schema_is_cached_next_to_the_file(tmp_path):
+    csv_path = _write_csv(tmp_path, pd.DataFrame({'a': [1, 2]}))
+
+    schema = infer_read_schema(csv_path)
+
+    assert (tmp_path / 'data.csv.schema.json').exists()
+    assert infer_read_schema(csv_path) == schema
+
+
+def test_both_csv_engines_write_the_same_parquet_layout(tmp_path):
+    csv_path = _write_csv(tmp_path, generate_teamresult_df(120_000, seed=0))
+    files = {}
+    for engine in ('pandas', 'pyarrow'):
+        parquet_path = str(tmp_path / f'{engine}.parquet')
+        result = convert_csv_to_parquet(csv_path, parquet_path, chunksize=50_000, engine=engine)
+        assert result.shape[0] == 120_000
+        files[engine] = pq.ParquetFile(parquet_path)
+
+    pandas_file, pyarrow_file = files['pandas'], files['pyarrow']
+    assert pyarrow_file.schema_arrow.equals(pandas_file.schema_arrow)
+    assert [pyarrow_file.metadata.row_group(i).num_rows for i in range(pyarrow_file.num_row_groups)] == \
+        [pandas_file.metadata.row_group(i).num_rows for i in range(pandas_file.num_row_groups)] == \
+        [50_000, 50_000, 20_000]
+    pd.testing.assert_frame_equal(pyarrow_file.read().to_pandas(), pandas_file.read().to_pandas())
+
+
+def test_pyarrow_engine_rejects_unsupported_read_csv_kwargs(tmp_path):
+    csv_path = _write_csv(tmp_path, pd.DataFrame({'a': [1, 2]}))
+
+    with pytest.raises(ValueError):
+        convert_csv_to_parquet(csv_path, str(tmp_path / 'out.parquet'), transform=lambda chunk: chunk,
+                               engine='pyarrow', read_csv_kwargs={'sep': ';'})
+
+
+@pytest.mark.parametrize('mode', ['sequential', 'threads', 'asyncio'])
+def test_read_files_times_whole_reads_and_keeps_file_latencies(tmp_path, mode):
+    for i in range(3):
+        generate_teamresult_df(100, seed=i).to_parquet(str(tmp_path / f'part-{i}.parquet'))
+
+    df, result = read_files(str(tmp_path / '*.parquet'), mode=mode, workers=2, repeat=2)
+
+    assert len(df) == 300
+    assert len(result.samples) == 2
+    assert result.elapsed_time == result.median_time
+    assert len(result.latencies) == 6
+    assert result.tags['mode'] == mode and result.tags['n_files'] == 3
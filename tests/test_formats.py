@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from fasting_pandas.formats import get_format
+
+
+def test_feather_mmap_reads_numeric_columns_without_copying(tmp_path):
+    df = pd.DataFrame({'a': np.arange(200_000), 'b': np.linspace(0, 1, 200_000)})
+    file_format = get_format('feather-mmap')
+    file_path = str(tmp_path / f'data.{file_format.extension}')
+    file_format.writer(df, file_path, **file_format.write_options)
+
+    allocated = pa.total_allocated_bytes()
+    read = file_format.reader(file_path, **file_format.read_options)
+
+    assert pa.total_allocated_bytes() - allocated < df.memory_usage().sum() / 100
+    pd.testing.assert_frame_equal(read, df)
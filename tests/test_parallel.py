@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+from fasting_pandas.datasets import generate_testscore_chunk, generate_testscore_df
+from fasting_pandas.parallel import parallel_apply
+
+
+def calculate_my_reward(row):
+    if row['study_time'] >= 4 and row['test_1_score'] >= 0.9:
+        return row['happy_food']
+    elif row['test_1_score'] >= 0.65 and row['age'] <= 13:
+        return row['happy_food']
+    return row['sad_food']
+
+
+@pytest.mark.parametrize('n_workers', [1, 2])
+def test_parallel_apply_matches_apply(n_workers):
+    df = generate_testscore_df(1_000, seed=0)
+
+    rewards = parallel_apply(df, calculate_my_reward, n_workers=n_workers, chunk_rows=300)
+
+    assert rewards.index.equals(df.index)
+    assert rewards.tolist() == df.apply(calculate_my_reward, axis=1).tolist()
+    assert all(type(reward) is str for reward in rewards)
+
+
+def test_parallel_apply_shares_categorical_columns_as_values():
+    df = generate_testscore_chunk(100, seed=0, offset=50)
+
+    rewards = parallel_apply(df, calculate_my_reward, n_workers=1)
+
+    assert rewards.index.equals(df.index)
+    assert rewards.tolist() == df.apply(calculate_my_reward, axis=1).astype(str).tolist()
+
+
+def test_parallel_apply_rejects_unshareable_columns():
+    with pytest.raises(TypeError):
+        parallel_apply(pd.DataFrame({'a': [[1], [2]]}), len, n_workers=1)
@@ -0,0 +1,52 @@
+import time
+
+import pandas as pd
+import pytest
+
+from fasting_pandas.core import ResultStore, TimedPandas
+from fasting_pandas.profiling import CallProfile, resolve_profile_mode
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_cprofile_finds_the_hot_function():
+    with CallProfile() as profile:
+        busy_wait(0.05)
+
+    top = profile.top_functions(3)
+
+    assert top[0]['function'].startswith('busy_wait')
+    assert top[0]['calls'] == 1
+
+
+def test_sampling_profile_writes_collapsed_stacks(tmp_path):
+    with CallProfile('sampling', interval=0.001) as profile:
+        busy_wait(0.1)
+
+    profile.dump_collapsed_stacks(str(tmp_path / 'stacks.txt'))
+
+    assert profile.top_functions(1)[0]['function'].startswith('busy_wait')
+    assert 'busy_wait' in (tmp_path / 'stacks.txt').read_text()
+
+
+def test_profiles_round_trip_through_the_results_table(tmp_path):
+    db_path = str(tmp_path / 'results.db')
+    _, result = TimedPandas(pd.DataFrame({'a': range(1_000)})).time('sum', profile=True, profile_top=5)
+
+    with ResultStore(db_path) as store:
+        store.add(result)
+        loaded, = store.iter_results()
+
+    assert loaded.profile_top == result.profile_top
+    assert loaded.profile.stats == result.profile.stats
+
+
+def test_resolve_profile_mode():
+    assert resolve_profile_mode(False) is None
+    assert resolve_profile_mode(True) == 'cprofile'
+    with pytest.raises(ValueError):
+        resolve_profile_mode('perf')
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from fasting_pandas.core import ResultStore, TimedPandas
+
+
+def _timed_result(repeat=2, tags=None):
+    _, result = TimedPandas(pd.DataFrame({'a': [1, 2, 3]})).time('sum', repeat=repeat, tags=tags)
+    return result
+
+
+def test_results_round_trip(tmp_path):
+    db_path = str(tmp_path / 'results.db')
+    result = _timed_result(tags={'file_format': 'csv'})
+
+    with ResultStore(db_path, run_id='run-1') as store:
+        store.add(result)
+        loaded, = store.iter_results()
+
+    assert loaded.method_name == 'sum'
+    assert loaded.shape == (3, 1)
+    assert loaded.samples == result.samples
+    assert loaded.tags == {'file_format': 'csv'}
+    assert loaded.run_id == 'run-1'
+    pd.testing.assert_series_equal(loaded.memory_usage_detail, result.memory_usage_detail)
+
+
+def test_buffered_results_are_saved_when_the_block_raises(tmp_path):
+    db_path = str(tmp_path / 'results.db')
+
+    with pytest.raises(RuntimeError):
+        with ResultStore(db_path, batch_size=100, flush_interval=3600) as store:
+            store.add(_timed_result())
+            raise RuntimeError('benchmark crashed')
+
+    with ResultStore(db_path) as store:
+        assert len(list(store.iter_results())) == 1
+
+
+def test_latencies_are_stored_apart_from_samples(tmp_path):
+    db_path = str(tmp_path / 'results.db')
+    result = _timed_result()
+    result.latencies = [0.1, 0.2, 0.3]
+
+    with ResultStore(db_path) as store:
+        store.add(result)
+        loaded, = store.iter_results()
+
+    assert loaded.latencies == [0.1, 0.2, 0.3]
+    assert loaded.samples == result.samples
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fasting_pandas.datasets import generate_testscore_chunk, generate_testscore_df
+from fasting_pandas.rules import RuleSet, select_rules
+
+REWARD_RULES = [
+    ('study_time >= 4 & test_1_score >= 0.9', 'happy_food'),
+    ('test_1_score >= 0.65 & age <= 13', 'happy_food'),
+]
+
+
+def calculate_my_reward(row):
+    if row['study_time'] >= 4 and row['test_1_score'] >= 0.9:
+        return row['happy_food']
+    elif row['test_1_score'] >= 0.65 and row['age'] <= 13:
+        return row['happy_food']
+    return row['sad_food']
+
+
+@pytest.mark.parametrize('chunk_rows', [None, 7])
+def test_rules_match_the_row_wise_function(chunk_rows):
+    df = generate_testscore_df(100, seed=0)
+
+    rewards = select_rules(df, REWARD_RULES, default='sad_food', chunk_rows=chunk_rows)
+
+    assert rewards.tolist() == df.apply(calculate_my_reward, axis=1).tolist()
+
+
+def test_categorical_values_stay_categorical():
+    df = generate_testscore_chunk(100, seed=0)
+
+    rewards = select_rules(df, REWARD_RULES, default='sad_food')
+
+    assert isinstance(rewards.dtype, pd.CategoricalDtype)
+    assert rewards.astype(str).tolist() == df.astype({'happy_food': str, 'sad_food': str}).apply(
+        calculate_my_reward, axis=1).tolist()
+
+
+def test_later_conditions_only_see_unassigned_rows_once_most_are_matched():
+    seen = []
+
+    def second(frame):
+        seen.append(frame['x'].tolist())
+        return frame['x'] > 0
+
+    rules = RuleSet([('x > 4', 'big'), (second, 'positive')], default='other')
+
+    rewards = rules.evaluate(pd.DataFrame({'x': [1, 5, 10, 20, 30, -1]}))
+
+    assert rewards.tolist() == ['positive', 'big', 'big', 'big', 'big', 'other']
+    assert seen == [[1, -1]]
+
+
+def test_first_matching_rule_wins_and_literals_mix_with_callables():
+    df = pd.DataFrame({'x': [1, 5, 10]})
+    rules = RuleSet([(lambda frame: frame['x'] > 4, 1), ('x > 0', 2)], default=0)
+
+    assert rules.evaluate(df).tolist() == [2, 1, 1]
+    assert rules.evaluate(df, chunk_rows=1).to_numpy().dtype == np.int64
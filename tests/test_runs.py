@@ -0,0 +1,86 @@
+import pytest
+
+from fasting_pandas.core import ResultStore, TimedResult
+from fasting_pandas.runs import compare, latest_run, list_runs, main, start_run, welch_test
+
+
+def _save_run(db_path, cells, label=None, kind=None):
+    """Saves a run with one result per (method_name, tags, samples) cell and returns its run_id."""
+    run_id = start_run(db_path, label=label, kind=kind)
+    with ResultStore(db_path, run_id=run_id) as store:
+        for method_name, tags, samples in cells:
+            store.add(TimedResult(method_name, 'TimedPandas', (1_000, 6), 1_000, None, min(samples), None,
+                                  samples=samples, tags=tags))
+    return run_id
+
+
+def test_welch_test_detects_a_clear_slowdown():
+    _, p_value = welch_test([1.0, 1.1, 0.9, 1.0], [2.0, 2.1, 1.9, 2.0])
+
+    assert p_value < 0.001
+    assert welch_test([1.0], [2.0]) == (None, None)
+
+
+def test_compare_keys_cells_on_every_tag(tmp_path):
+    db_path = str(tmp_path / 'runs.db')
+    fast, slow = [1.0, 1.01, 0.99], [2.0, 2.01, 1.99]
+    run_a = _save_run(db_path, [('read_files', {'mode': 'threads', 'workers': 1}, slow),
+                                ('read_files', {'mode': 'threads', 'workers': 8}, fast)])
+    run_b = _save_run(db_path, [('read_files', {'mode': 'threads', 'workers': 1}, slow),
+                                ('read_files', {'mode': 'threads', 'workers': 8}, slow)])
+
+    report = compare(db_path, run_a, run_b)
+
+    assert len(report) == 2
+    assert report.set_index('tags')['regression'].to_dict() == {
+        '{"mode": "threads", "workers": 1}': False, '{"mode": "threads", "workers": 8}': True}
+    assert report['tested'].all()
+    assert list_runs(db_path)['n_results'].tolist() == [2, 2]
+    assert latest_run(db_path) == run_b
+
+
+def test_latest_run_of_a_kind(tmp_path):
+    db_path = str(tmp_path / 'runs.db')
+    matrix = _save_run(db_path, [('to_csv', {'file_format': 'csv'}, [1.0])], kind='matrix')
+    _save_run(db_path, [('read_files', {'mode': 'threads'}, [1.0])], kind='multi-file reads')
+
+    assert latest_run(db_path, kind='matrix') == matrix
+    assert latest_run(db_path, kind='scaling') is None
+
+
+def test_single_samples_are_reported_as_untested(tmp_path):
+    db_path = str(tmp_path / 'runs.db')
+    run_a = _save_run(db_path, [('to_csv', {'file_format': 'csv'}, [1.0])])
+    run_b = _save_run(db_path, [('to_csv', {'file_format': 'csv'}, [1.5])])
+
+    report = compare(db_path, run_a, run_b)
+
+    assert not report['tested'].any()
+    assert report['regression'].all()
+
+
+def test_main_exit_codes(tmp_path, capsys):
+    db_path = str(tmp_path / 'runs.db')
+    _save_run(db_path, [('to_csv', {}, [1.0, 1.01])])
+    _save_run(db_path, [('to_csv', {}, [3.0, 3.01])])
+
+    assert main([db_path, 'compare', 'previous']) == 1
+    assert main([db_path, 'compare', 'previous', '--threshold', '10']) == 0
+    assert main([db_path, 'compare', 'unknown-run']) == 2
+    assert 'unknown-run' in capsys.readouterr().err
+
+
+def test_store_saves_results_under_its_run_id(tmp_path):
+    db_path = str(tmp_path / 'runs.db')
+    run_id = _save_run(db_path, [('to_csv', {}, [1.0])])
+
+    with ResultStore(db_path) as store:
+        assert [result.run_id for result in store.iter_results()] == [run_id]
+
+
+def test_compare_rejects_unknown_runs(tmp_path):
+    db_path = str(tmp_path / 'runs.db')
+    run_id = _save_run(db_path, [('to_csv', {}, [1.0])])
+
+    with pytest.raises(ValueError):
+        compare(db_path, run_id, 'unknown-run')
@@ -0,0 +1,90 @@
+import pandas as pd
+import pytest
+
+from fasting_pandas.core import TimedPandas
+from fasting_pandas.utils import summarize_timings, timeit
+
+
+def test_timeit_reports_the_median_of_repeated_runs():
+    calls = []
+
+    @timeit(repeat=3, warmup=2)
+    def add(a, b):
+        calls.append(1)
+        return a + b
+
+    result, seconds = add(1, 2)
+
+    assert result == 3
+    assert len(calls) == 5
+    assert seconds >= 0
+
+
+@pytest.mark.parametrize('options', [{'repeat': 0}, {'warmup': -1}])
+def test_timeit_rejects_invalid_run_counts(options):
+    with pytest.raises(ValueError):
+        timeit(lambda: None, **options)
+
+
+@pytest.mark.parametrize('options', [{'repeat': 0}, {'warmup': -1}])
+def test_time_rejects_invalid_run_counts(options):
+    with pytest.raises(ValueError):
+        TimedPandas(pd.DataFrame({'a': [1]})).time('sum', **options)
+
+
+def test_time_keeps_one_sample_per_run():
+    tdf = TimedPandas(pd.DataFrame({'a': [1, 2, 3]}))
+
+    result, timed_result = tdf.time('sum', repeat=4)
+
+    assert result['a'] == 6
+    assert len(timed_result.samples) == 4
+    assert timed_result.elapsed_time == timed_result.median_time
+
+
+def test_summarize_timings_uses_nearest_rank_p95():
+    summary = summarize_timings([float(i) for i in range(1, 21)])
+
+    assert summary['min'] == 1.0 and summary['median'] == 10.5 and summary['p95'] == 19.0
+
+
+def _write_loc(tdf):
+    tdf.loc[0:50, 'team'] = 'x' * 300
+
+
+def _write_iloc(tdf):
+    tdf.iloc[0, 0] = 'x' * 300
+
+
+def _write_at(tdf):
+    tdf.at[0, 'team'] = 'x' * 300
+
+
+def _write_iat(tdf):
+    tdf.iat[0, 0] = 'x' * 300
+
+
+def _write_column(tdf):
+    tdf['team'] = 'x' * 300
+
+
+def _rename_columns(tdf):
+    tdf.columns = ['x', 'y']
+
+
+def _set_string_index(tdf):
+    tdf.index = [f'row-{i}' for i in range(len(tdf))]
+
+
+@pytest.mark.parametrize('write', [_write_loc, _write_iloc, _write_at, _write_iat, _write_column, _rename_columns,
+                                   _set_string_index])
+@pytest.mark.parametrize('dtype', ['str', object])
+def test_memory_profile_follows_writes(write, dtype):
+    tdf = TimedPandas({'team': pd.Series(['yellow'] * 100, dtype=dtype), 'age': range(100)})
+    tdf.memory_profile()
+
+    write(tdf)
+
+    values, labels = tdf.memory_profile()
+    assert values.sum() == tdf.memory_usage(deep=True).sum()
+    assert list(labels) == ['Index', *tdf.columns]